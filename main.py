@@ -1,75 +1,308 @@
-import sys
-import pandas as pd
+import argparse
 import os
+import sys
 
 # Adiciona o diretório raiz do projeto ao sys.path para que as importações funcionem
 project_root = os.path.abspath(os.path.dirname(__file__))
 sys.path.append(project_root)
 
-from src.utils.logger import setup_logger
-from src.utils.data_loader import load_exportation_data
-from src.utils.geo_processor import GeoProcessor
-from src.utils.clustering_model import ClusteringModel
-from src.utils.summary_utils import summarize_producers_by_extensionist
+# Apenas módulos leves são importados aqui; pandas, scikit-learn e afins são importados
+# dentro dos subcomandos que realmente precisam deles.
+from src.utils.logger import setup_logger, configure_logging, LOG_LEVELS
+from src.utils.instrumentation import start_run, finish_run, stage, SUPPORTED_PROFILERS
+from src.utils.config import load_config, SUPPORTED_BACKENDS
 
 logger = setup_logger()
 
-def main():
-    logger.info("Iniciando o processo de Remodelação e Otimização Geográfica de Extensionistas...")
+REQUIRED_COLUMNS = ['ID_Aviario', 'ID_Nucleo', 'Nome_Produtor', 'Extensionista_Atual', 'Latitude', 'Longitude',
+                    'Municipio', 'Microrregiao', 'Area']
+PREVIEW_COLUMNS = ['ID_Aviario', 'ID_Nucleo', 'Microrregiao', 'Extensionista_Atual', 'Extensionista_Proposto', 'immutable_allocation']
+
+
+def _allocation_path(config: dict, path: str = None) -> str:
+    return path or os.path.join(config['exports']['directory'], config['exports']['allocation_file'])
+
+
+def _read_allocation(path: str):
+    """
+    Lê a alocação otimizada exportada pelo subcomando 'optimize'. Retorna None se o arquivo não existir.
+    """
+    import pandas as pd
+
+    if not os.path.exists(path):
+        logger.error("Arquivo de alocação '%s' não encontrado. Execute o subcomando 'optimize' primeiro.", path)
+        return None
+    return pd.read_csv(path, sep=';', decimal='.')
+
+
+def run_optimization(config: dict, compare_backends: bool = False):
+    """
+    Executa o pipeline completo (carga, imutabilidade e clustering) conforme a configuração.
+
+    Args:
+        config (dict): Configuração carregada por load_config.
+        compare_backends (bool): Se True, reporta a diferença de qualidade entre os backends 'kmeans' e 'minibatch' antes da otimização.
+
+    Returns:
+        pd.DataFrame: DataFrame com a coluna 'Extensionista_Proposto', ou None se os dados não puderem ser carregados.
+    """
+    from src.utils.data_loader import load_exportation_data
+    from src.utils.geo_processor import GeoProcessor
+    from src.utils.clustering_model import ClusteringModel
 
     # 1. Carregar os dados
-    df_data = load_exportation_data()
+    df_data = load_exportation_data(config['data']['exportation_file'])
     if df_data is None:
         logger.error("Falha ao carregar os dados. Encerrando.")
-        return
-    logger.info(f"Dados carregados com sucesso. Total de {len(df_data)} registros.")
+        return None
+    logger.info("Dados carregados com sucesso. Total de %s registros.", len(df_data))
 
     # 2. Configurar e aplicar o GeoProcessor
-    immutability_rules = [
-        {
-            'type': 'compound_and',
-            'sub_rules': [
-                {'column': 'Extensionista_Atual', 'type': 'in_list', 'list_name': 'immutable_extensionists'},
-                {'column': 'Nome_Produtor', 'type': 'in_list', 'list_name': 'immutable_producers'}
-            ]
-        }
-    ]
     geo_processor = GeoProcessor(
-        immutability_rules=immutability_rules,
-        immutable_producers_file='PRODUTORES_IMUTAVEIS.csv',
-        immutable_extensionists_file='EXTENSIONISTAS_IMUTAVEIS.csv'
+        immutability_rules=config['immutability_rules'],
+        immutable_producers_file=config['data']['immutable_producers_file'],
+        immutable_extensionists_file=config['data']['immutable_extensionists_file']
     )
     df_processed = geo_processor.apply_immutability_rules(df_data.copy())
-    logger.info(f"GeoProcessor aplicado. {df_processed['immutable_allocation'].sum()} aviários marcados como imutáveis.")
+    logger.info("GeoProcessor aplicado. %s aviários marcados como imutáveis.", df_processed['immutable_allocation'].sum())
 
     # 3. Configurar e aplicar o ClusteringModel
-    # Extrair extensionistas atuais para o modelo
-    current_extensionists = df_processed['Extensionista_Atual'].unique().tolist()
-
-    # Definir a média desejada de aviários por extensionista (exemplo, pode vir de input do usuário)
-    desired_avg_aviaries = 40 # Exemplo: 40 aviários por extensionista
-
-    clustering_model = ClusteringModel(
-        target_aviaries_min=40,
-        target_aviaries_max=43,
-        current_extensionists=current_extensionists,
-        desired_avg_aviaries_per_extensionist=desired_avg_aviaries
-    )
+    clustering_model = ClusteringModel.from_config(config, df_processed['Extensionista_Atual'].unique().tolist())
+    if compare_backends:
+        report = clustering_model.compare_backends(df_processed)
+        for backend in ('kmeans', 'minibatch'):
+            metrics = report[backend]
+            print(f"{backend}: inércia={metrics['inertia']:.6f}, clusters abaixo/acima da meta={metrics['clusters_below_min']}/"
+                  f"{metrics['clusters_above_max']}, aviários excedentes={metrics['aviaries_above_max']}, tempo={metrics['wall_time_s']:.3f}s")
+        print(f"Diferença de inércia do minibatch: {report['inertia_gap'] * 100:.2f}%")
     df_optimized = clustering_model.optimize_allocation(df_processed.copy())
     logger.info("ClusteringModel aplicado. Alocação otimizada gerada.")
+    return df_optimized
+
+
+def cmd_validate(args, config: dict) -> int:
+    """
+    Carrega a base de aviários e verifica colunas obrigatórias, valores ausentes, duplicidades e coordenadas.
+    """
+    from src.utils.data_loader import load_exportation_data, load_list_from_csv
+
+    df_data = load_exportation_data(config['data']['exportation_file'])
+    if df_data is None:
+        return 1
+
+    errors = []
+    missing_columns = [column for column in REQUIRED_COLUMNS if column not in df_data.columns]
+    if missing_columns:
+        errors.append(f"Colunas obrigatórias ausentes: {missing_columns}.")
+
+    present_columns = [column for column in REQUIRED_COLUMNS if column in df_data.columns]
+    null_counts = df_data[present_columns].isna().sum()
+    for column, count in null_counts[null_counts > 0].items():
+        errors.append(f"Coluna '{column}' possui {count} valores ausentes.")
+
+    if 'ID_Aviario' in df_data.columns:
+        duplicated = int(df_data['ID_Aviario'].duplicated().sum())
+        if duplicated:
+            errors.append(f"{duplicated} valores duplicados em 'ID_Aviario'.")
+
+    if 'Latitude' in df_data.columns and 'Longitude' in df_data.columns:
+        invalid_coords = int((~df_data['Latitude'].between(-90, 90) | ~df_data['Longitude'].between(-180, 180)).sum())
+        if invalid_coords:
+            errors.append(f"{invalid_coords} aviários com coordenadas fora do intervalo válido.")
+
+    if 'ID_Nucleo' in df_data.columns and 'Coordenadas' in df_data.columns:
+        split_nuclei = int((df_data.groupby('ID_Nucleo')['Coordenadas'].nunique() > 1).sum())
+        if split_nuclei:
+            logger.warning("%s núcleos possuem aviários com coordenadas diferentes.", split_nuclei)
+
+    immutable_producers = load_list_from_csv(config['data']['immutable_producers_file'], 'Nome_Produtor')
+    immutable_extensionists = load_list_from_csv(config['data']['immutable_extensionists_file'], 'Extensionista_Atual')
+    for name, values, column in (('produtores', immutable_producers, 'Nome_Produtor'),
+                                 ('extensionistas', immutable_extensionists, 'Extensionista_Atual')):
+        if column in df_data.columns:
+            not_found = sorted(set(values) - set(df_data[column].astype(str)))
+            if not_found:
+                logger.warning("%s %s imutáveis não encontrados na base: %s", len(not_found), name, not_found)
+
+    summary = {
+        'Aviários': len(df_data),
+        'Núcleos únicos': df_data['ID_Nucleo'].nunique() if 'ID_Nucleo' in df_data.columns else '-',
+        'Municípios únicos': df_data['Municipio'].nunique() if 'Municipio' in df_data.columns else '-',
+        'Extensionistas únicos': df_data['Extensionista_Atual'].nunique() if 'Extensionista_Atual' in df_data.columns else '-',
+    }
+    for label, value in summary.items():
+        print(f"{label}: {value}")
+
+    for error in errors:
+        logger.error(error)
+    if errors:
+        logger.error("Validação falhou com %s problema(s).", len(errors))
+        return 1
+    logger.info("Validação concluída sem problemas.")
+    return 0
+
+
+def cmd_optimize(args, config: dict) -> int:
+    """
+    Executa o pipeline completo e exporta a alocação otimizada e o sumário por extensionista.
+    """
+    from src.utils.summary_utils import summarize_producers_by_extensionist
+
+    if args.backend:
+        config['clustering']['backend'] = args.backend
+    df_optimized = run_optimization(config, compare_backends=args.compare_backends)
+    if df_optimized is None:
+        return 1
 
     # 4. Exibir e exportar resultados
     logger.info("Primeiras 5 linhas do DataFrame otimizado:")
-    print(df_optimized[['ID_Aviario', 'ID_Nucleo', 'Microrregiao', 'Extensionista_Atual', 'Extensionista_Proposto', 'immutable_allocation']].head())
+    print(df_optimized[PREVIEW_COLUMNS].head())
 
-    exports_dir = os.path.join(project_root, 'exports')
+    exports_dir = config['exports']['directory']
     os.makedirs(exports_dir, exist_ok=True)
-    output_file_path = os.path.join(exports_dir, 'final_optimized_allocation.csv')
-    df_optimized.to_csv(output_file_path, sep=';', decimal='.', index=False)
-    logger.info(f"Alocação otimizada final exportada para: {output_file_path}")
+    output_file_path = _allocation_path(config)
+    with stage('export_allocation', rows=len(df_optimized)):
+        df_optimized.to_csv(output_file_path, sep=';', decimal='.', index=False)
+    logger.info("Alocação otimizada final exportada para: %s", output_file_path)
 
     # 5. Sumarizar produtores por extensionista
-    summarize_producers_by_extensionist(df_optimized, exports_dir)
+    summarize_producers_by_extensionist(df_optimized, exports_dir, config['exports']['summary_file'])
+    return 0
+
+
+def cmd_summarize(args, config: dict) -> int:
+    """
+    Gera o sumário por extensionista a partir de uma alocação já exportada, sem executar o clustering.
+    """
+    from src.utils.summary_utils import summarize_producers_by_extensionist
+
+    df_allocation = _read_allocation(_allocation_path(config, args.input))
+    if df_allocation is None:
+        return 1
+    summarize_producers_by_extensionist(df_allocation, config['exports']['directory'], config['exports']['summary_file'])
+    return 0
+
+
+def cmd_export(args, config: dict) -> int:
+    """
+    Converte a alocação já exportada para outro formato ou local (CSV com separadores configuráveis ou JSON).
+    """
+    df_allocation = _read_allocation(_allocation_path(config, args.input))
+    if df_allocation is None:
+        return 1
+    if args.columns:
+        missing = [column for column in args.columns if column not in df_allocation.columns]
+        if missing:
+            logger.error("Colunas não encontradas na alocação: %s", missing)
+            return 1
+        df_allocation = df_allocation[args.columns]
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with stage('export', rows=len(df_allocation)):
+        if args.format == 'json':
+            df_allocation.to_json(args.output, orient='records', force_ascii=False, indent=2)
+        else:
+            df_allocation.to_csv(args.output, sep=args.sep, decimal=args.decimal, index=False)
+    logger.info("Alocação exportada em %s para: %s", args.format.upper(), args.output)
+    return 0
+
+
+def cmd_benchmark(args, config: dict) -> int:
+    """
+    Executa o benchmark das etapas do pipeline (argumentos repassados para src/utils/benchmark.py),
+    com as regras, metas e clustering da configuração carregada por --config.
+    """
+    from src.utils.benchmark import main as benchmark_main
+
+    return benchmark_main(args.benchmark_args, config=config)
+
+
+def _global_options_parser(suppress_defaults: bool = False) -> argparse.ArgumentParser:
+    """
+    Cria o parser das opções globais, aceitas antes ou depois do subcomando.
+
+    Nos subcomandos os padrões são suprimidos, para que uma opção informada antes do
+    subcomando não seja sobrescrita pelo valor padrão.
+    """
+    def default(value):
+        return argparse.SUPPRESS if suppress_defaults else value
+
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument('--config', default=default(None), help="Arquivo JSON que sobrescreve config/default_config.json.")
+    parser.add_argument('--log-level', type=str.upper, choices=LOG_LEVELS, default=default(None), help="Nível mínimo de log (padrão: INFO).")
+    parser.add_argument('--log-format', choices=['text', 'json'], default=default(None), help="Formato do log (padrão: text).")
+    parser.add_argument('--profile-stage', default=default(os.environ.get('REMODELACAO_PROFILE_STAGE') or None),
+                        help="Etapa a ser perfilada (ex.: optimize_allocation).")
+    parser.add_argument('--profiler', choices=SUPPORTED_PROFILERS, default=default(os.environ.get('REMODELACAO_PROFILER', 'cprofile')))
+    parser.add_argument('--trace-memory', action='store_true', default=default(os.environ.get('REMODELACAO_TRACE_MEMORY', '0') == '1'),
+                        help="Mede o pico de memória de cada etapa com tracemalloc.")
+    return parser
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Remodelação e Otimização Geográfica de Extensionistas.",
+                                     parents=[_global_options_parser()])
+    parser.set_defaults(func=cmd_optimize, backend=None, compare_backends=False)
+    global_options = _global_options_parser(suppress_defaults=True)
+
+    subparsers = parser.add_subparsers(dest='command')
+
+    validate_parser = subparsers.add_parser('validate', parents=[global_options], help="Carrega e valida a base de aviários.")
+    validate_parser.set_defaults(func=cmd_validate)
+
+    optimize_parser = subparsers.add_parser('optimize', parents=[global_options], help="Executa a otimização e exporta a nova alocação (padrão).")
+    optimize_parser.add_argument('--backend', choices=SUPPORTED_BACKENDS, help="Backend de clustering (sobrescreve a configuração).")
+    optimize_parser.add_argument('--compare-backends', action='store_true',
+                                 help="Reporta a diferença de inércia e de violações de capacidade entre kmeans e minibatch.")
+    optimize_parser.set_defaults(func=cmd_optimize)
+
+    summarize_parser = subparsers.add_parser('summarize', parents=[global_options], help="Sumariza uma alocação já exportada por extensionista.")
+    summarize_parser.add_argument('--input', help="CSV da alocação otimizada (padrão: exports/final_optimized_allocation.csv).")
+    summarize_parser.set_defaults(func=cmd_summarize)
+
+    export_parser = subparsers.add_parser('export', parents=[global_options], help="Converte a alocação já exportada para outro formato.")
+    export_parser.add_argument('--input', help="CSV da alocação otimizada (padrão: exports/final_optimized_allocation.csv).")
+    export_parser.add_argument('--output', required=True, help="Arquivo de destino.")
+    export_parser.add_argument('--format', choices=['csv', 'json'], default='csv')
+    export_parser.add_argument('--sep', default=';', help="Separador do CSV (padrão: ';').")
+    export_parser.add_argument('--decimal', default='.', help="Separador decimal do CSV (padrão: '.').")
+    export_parser.add_argument('--columns', nargs='+', help="Colunas a exportar (padrão: todas).")
+    export_parser.set_defaults(func=cmd_export)
+
+    # Argumentos desconhecidos são repassados ao benchmark (ex.: --sizes 1000 10000); ver src/utils/benchmark.py -h
+    benchmark_parser = subparsers.add_parser('benchmark', parents=[global_options], help="Executa o benchmark com datasets sintéticos.")
+    benchmark_parser.set_defaults(func=cmd_benchmark)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    parser = build_parser()
+    args, extra_args = parser.parse_known_args(argv)
+    if args.func is cmd_benchmark:
+        args.benchmark_args = extra_args
+    elif extra_args:
+        parser.error(f"argumentos não reconhecidos: {' '.join(extra_args)}")
+    if args.log_level or args.log_format:
+        configure_logging(level=args.log_level, log_format=args.log_format)
+
+    try:
+        config = load_config(args.config)
+    except (OSError, ValueError) as e:
+        logger.error("Falha ao carregar a configuração: %s", e)
+        return 1
+
+    # O benchmark gerencia a própria instrumentação
+    if args.func is cmd_benchmark:
+        return args.func(args, config)
+
+    logger.info("Iniciando o processo de Remodelação e Otimização Geográfica de Extensionistas...")
+    start_run(trace_memory=args.trace_memory, profile_stage=args.profile_stage, profiler=args.profiler)
+    try:
+        return args.func(args, config)
+    finally:
+        finish_run()
+
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,443 @@
+import copy
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import os
+
+# Importa o logger e os componentes do pipeline
+try:
+    from .logger import setup_logger, configure_logging
+    from .config import load_config, SUPPORTED_BACKENDS
+    from .data_loader import load_exportation_data, load_list_from_csv
+    from .geo_processor import GeoProcessor
+    from .clustering_model import ClusteringModel
+except ImportError:
+    import sys
+    import os
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+    from src.utils.logger import setup_logger, configure_logging
+    from src.utils.config import load_config, SUPPORTED_BACKENDS
+    from src.utils.data_loader import load_exportation_data, load_list_from_csv
+    from src.utils.geo_processor import GeoProcessor
+    from src.utils.clustering_model import ClusteringModel
+
+logger = setup_logger()
+
+# O modo do solver corresponde ao backend de clustering do ClusteringModel
+SUPPORTED_SOLVER_MODES = SUPPORTED_BACKENDS
+
+
+def default_params(config: dict) -> dict:
+    """
+    Extrai da configuração (ver load_config) os valores padrão dos parâmetros de um pedido de alocação.
+    """
+    targets = config['targets']
+    return {
+        'target_aviaries_min': targets['target_aviaries_min'],
+        'target_aviaries_max': targets['target_aviaries_max'],
+        'desired_avg_aviaries_per_extensionist': targets.get('desired_avg_aviaries_per_extensionist'),
+        'immutability_rules': copy.deepcopy(config['immutability_rules']),
+        'solver_mode': config['clustering']['backend'],
+    }
+
+
+def _is_positive_int(value) -> bool:
+    # bool é subclasse de int, mas true/false não são metas válidas
+    return isinstance(value, int) and not isinstance(value, bool) and value > 0
+
+
+class LRUCache:
+    """
+    Cache LRU limitado (em entradas e em bytes) e seguro para uso entre threads.
+    Os valores são bytes (por exemplo, respostas JSON já serializadas).
+    """
+
+    def __init__(self, max_size: int = 128, max_bytes: int = None):
+        """
+        Args:
+            max_size (int): Quantidade máxima de entradas mantidas no cache.
+            max_bytes (int, optional): Tamanho máximo somado dos valores, em bytes. Sem limite se omitido.
+        """
+        self.max_size = max(1, max_size)
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str):
+        """
+        Retorna o valor associado à chave (ou None) e atualiza a ordem de uso.
+        """
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value) -> None:
+        """
+        Armazena o valor, descartando as entradas menos recentemente usadas enquanto algum limite
+        for excedido. Valores maiores que o limite de bytes não são armazenados.
+        """
+        size = len(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            logger.warning("Resultado de %.1f MB excede o limite do cache (%.1f MB) e não será armazenado.",
+                           size / (1024 * 1024), self.max_bytes / (1024 * 1024))
+            return
+        with self._lock:
+            if key in self._data:
+                self.total_bytes -= len(self._data.pop(key))
+            self._data[key] = value
+            self.total_bytes += size
+            while len(self._data) > self.max_size or (self.max_bytes is not None and self.total_bytes > self.max_bytes):
+                _, evicted = self._data.popitem(last=False)
+                self.total_bytes -= len(evicted)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+
+class AllocationService:
+    """
+    Mantém o dataset e as listas de imutabilidade carregados em memória e responde a pedidos
+    de alocação com parâmetros variáveis, reaproveitando resultados através de um cache LRU.
+    """
+
+    def __init__(self, config: dict = None, cache_size: int = 128, max_workers: int = 4, latency_window: int = 1000,
+                 cache_max_mb: float = 256):
+        """
+        Inicializa o serviço carregando os dados uma única vez.
+
+        Args:
+            config (dict, optional): Configuração carregada por load_config (arquivos de dados, regras de
+                                     imutabilidade, metas e clustering). Padrão é config/default_config.json.
+            cache_size (int): Quantidade máxima de resultados mantidos no cache LRU.
+            max_workers (int): Quantidade de workers que executam otimizações simultaneamente.
+            latency_window (int): Quantidade de latências recentes consideradas nas estatísticas.
+            cache_max_mb (float): Memória máxima ocupada pelas respostas em cache, em MB.
+        """
+        self.config = config or load_config()
+        self.default_params = default_params(self.config)
+        data = self.config['data']
+        file_name = data['exportation_file']
+        immutable_producers_file = data.get('immutable_producers_file')
+        immutable_extensionists_file = data.get('immutable_extensionists_file')
+
+        self.df_data = load_exportation_data(file_name)
+        if self.df_data is None:
+            raise RuntimeError(f"Não foi possível carregar o arquivo '{file_name}' para o serviço de alocação.")
+
+        self.immutable_producers = load_list_from_csv(immutable_producers_file, 'Nome_Produtor', separator=';') if immutable_producers_file else []
+        self.immutable_extensionists = load_list_from_csv(immutable_extensionists_file, 'Extensionista_Atual', separator=';') if immutable_extensionists_file else []
+        self.current_extensionists = self.df_data['Extensionista_Atual'].unique().tolist()
+
+        self.cache = LRUCache(cache_size, max_bytes=int(cache_max_mb * 1024 * 1024))
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='allocation-worker')
+        self._in_flight = {}
+        self._in_flight_lock = threading.Lock()
+        self._latencies = deque(maxlen=latency_window)
+        self._latency_lock = threading.Lock()
+        self.requests_total = 0
+        self.errors_total = 0
+        self.coalesced_total = 0
+        self.started_at = time.time()
+        logger.info("AllocationService inicializado com %s registros, cache de %s entradas e %s workers.", len(self.df_data), cache_size, max_workers)
+
+    def normalize_params(self, params: dict = None) -> dict:
+        """
+        Completa os parâmetros recebidos com os valores padrão da configuração e os valida.
+
+        Args:
+            params (dict, optional): Parâmetros do pedido de alocação.
+
+        Returns:
+            dict: Parâmetros completos, prontos para gerar a chave do cache.
+
+        Raises:
+            ValueError: Se houver parâmetros desconhecidos ou valores inválidos.
+        """
+        params = params or {}
+        unknown = set(params) - set(self.default_params)
+        if unknown:
+            raise ValueError(f"Parâmetros desconhecidos: {sorted(unknown)}.")
+
+        # Cópia profunda: as regras padrão não podem ser alteradas pelos pedidos
+        normalized = copy.deepcopy(self.default_params)
+        normalized.update(copy.deepcopy(params))
+        if normalized['solver_mode'] not in SUPPORTED_SOLVER_MODES:
+            raise ValueError(f"Modo de solver '{normalized['solver_mode']}' não suportado. Opções: {list(SUPPORTED_SOLVER_MODES)}.")
+        rules = normalized['immutability_rules']
+        if not isinstance(rules, list) or not all(isinstance(rule, dict) for rule in rules):
+            raise ValueError("'immutability_rules' deve ser uma lista de regras (objetos).")
+        for key in ('target_aviaries_min', 'target_aviaries_max'):
+            if not _is_positive_int(normalized[key]):
+                raise ValueError(f"'{key}' deve ser um inteiro positivo.")
+        if normalized['target_aviaries_min'] > normalized['target_aviaries_max']:
+            raise ValueError("'target_aviaries_min' não pode ser maior que 'target_aviaries_max'.")
+        desired_avg = normalized['desired_avg_aviaries_per_extensionist']
+        if desired_avg is not None and not _is_positive_int(desired_avg):
+            raise ValueError("'desired_avg_aviaries_per_extensionist' deve ser um inteiro positivo ou null.")
+        return normalized
+
+    @staticmethod
+    def cache_key(params: dict) -> str:
+        """
+        Gera o hash estável dos parâmetros normalizados.
+        """
+        payload = json.dumps(params, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _run_allocation(self, params: dict) -> dict:
+        """
+        Executa o pipeline de imutabilidade e clustering sobre os dados já carregados.
+        """
+        geo_processor = GeoProcessor(immutability_rules=params['immutability_rules'])
+        geo_processor.immutable_producers = self.immutable_producers
+        geo_processor.immutable_extensionists = self.immutable_extensionists
+        df_processed = geo_processor.apply_immutability_rules(self.df_data.copy())
+
+        # As metas e o modo do solver do pedido substituem os valores da configuração
+        clustering_model = ClusteringModel.from_config(
+            self.config,
+            self.current_extensionists,
+            target_aviaries_min=params['target_aviaries_min'],
+            target_aviaries_max=params['target_aviaries_max'],
+            desired_avg_aviaries_per_extensionist=params['desired_avg_aviaries_per_extensionist'],
+            clustering_backend=params['solver_mode']
+        )
+        df_optimized = clustering_model.optimize_allocation(df_processed)
+
+        summary = df_optimized.groupby('Extensionista_Proposto')['ID_Aviario'].count().sort_index()
+        allocation = df_optimized[['ID_Aviario', 'Extensionista_Atual', 'Extensionista_Proposto', 'immutable_allocation']]
+        return {
+            'params': params,
+            'total_aviaries': int(len(df_optimized)),
+            'immutable_aviaries': int(df_optimized['immutable_allocation'].sum()),
+            'num_extensionists': int(df_optimized['Extensionista_Proposto'].nunique()),
+            'aviaries_by_extensionist': {str(k): int(v) for k, v in summary.items()},
+            'allocation': json.loads(allocation.to_json(orient='records', force_ascii=False)),
+        }
+
+    def _record_latency(self, elapsed: float, error: bool = False) -> None:
+        with self._latency_lock:
+            self.requests_total += 1
+            if error:
+                self.errors_total += 1
+            else:
+                self._latencies.append(elapsed)
+
+    def _run_allocation_json(self, params: dict) -> bytes:
+        """
+        Executa a alocação e serializa o resultado uma única vez, no próprio worker.
+        """
+        return json.dumps(self._run_allocation(params), ensure_ascii=False).encode('utf-8')
+
+    def allocate_json(self, params: dict = None) -> bytes:
+        """
+        Responde a um pedido de alocação com o JSON já serializado, usando o cache LRU quando possível.
+        Pedidos idênticos que chegam ao mesmo tempo compartilham uma única execução.
+
+        O cache guarda os bytes da resposta: um acerto não copia nem reserializa a alocação.
+
+        Args:
+            params (dict, optional): Parâmetros do pedido (metas, regras e modo do solver).
+
+        Returns:
+            bytes: Objeto JSON (UTF-8) com o resultado da alocação e as chaves 'cache_hit' e 'cache_key'.
+        """
+        start = time.perf_counter()
+        try:
+            normalized = self.normalize_params(params)
+            key = self.cache_key(normalized)
+
+            payload = self.cache.get(key)
+            cache_hit = payload is not None
+            if not cache_hit:
+                with self._in_flight_lock:
+                    future = self._in_flight.get(key)
+                    owner = future is None
+                    if owner:
+                        future = self.executor.submit(self._run_allocation_json, normalized)
+                        self._in_flight[key] = future
+                if not owner:
+                    # O pedido aproveita uma execução em andamento: não é uma falha real do cache
+                    with self._latency_lock:
+                        self.coalesced_total += 1
+                try:
+                    payload = future.result()
+                    # Apenas o pedido que iniciou a execução armazena o resultado e libera a chave,
+                    # nesta ordem, para que nenhum pedido encontre a chave fora do cache e do andamento
+                    if owner:
+                        self.cache.put(key, payload)
+                finally:
+                    if owner:
+                        with self._in_flight_lock:
+                            self._in_flight.pop(key, None)
+        except Exception:
+            self._record_latency(time.perf_counter() - start, error=True)
+            raise
+
+        elapsed = time.perf_counter() - start
+        self._record_latency(elapsed)
+        logger.info("Pedido de alocação %s respondido em %.1f ms (cache_hit=%s).", key[:12], elapsed * 1000, cache_hit)
+        # Os metadados do pedido são inseridos no início do objeto JSON em cache, sem desserializá-lo
+        header = json.dumps({'cache_hit': cache_hit, 'cache_key': key})[:-1].encode('utf-8')
+        return header + b', ' + payload[1:]
+
+    def allocate(self, params: dict = None) -> dict:
+        """
+        Variante de allocate_json que retorna o resultado como dicionário (um objeto novo a cada chamada).
+
+        Returns:
+            dict: Resultado da alocação, com as chaves 'cache_hit' e 'cache_key' adicionadas.
+        """
+        return json.loads(self.allocate_json(params))
+
+    def stats(self) -> dict:
+        """
+        Retorna as estatísticas de uso do cache e as latências dos pedidos.
+        """
+        with self._latency_lock:
+            latencies = sorted(self._latencies)
+            requests_total = self.requests_total
+            errors_total = self.errors_total
+            coalesced_total = self.coalesced_total
+
+        def percentile(p: float) -> float:
+            if not latencies:
+                return 0.0
+            index = min(len(latencies) - 1, int(round(p * (len(latencies) - 1))))
+            return latencies[index] * 1000
+
+        lookups = self.cache.hits + self.cache.misses
+        return {
+            'uptime_s': round(time.time() - self.started_at, 3),
+            'requests_total': requests_total,
+            'errors_total': errors_total,
+            'cache_size': len(self.cache),
+            'cache_max_size': self.cache.max_size,
+            'cache_mb': round(self.cache.total_bytes / (1024 * 1024), 3),
+            'cache_max_mb': round(self.cache.max_bytes / (1024 * 1024), 3),
+            'cache_hits': self.cache.hits,
+            'cache_misses': self.cache.misses,
+            'cache_hit_rate': round(self.cache.hits / lookups, 4) if lookups else 0.0,
+            # Pedidos que compartilharam uma execução em andamento (contados como falhas pelo cache)
+            'coalesced_total': coalesced_total,
+            'effective_hit_rate': round((self.cache.hits + coalesced_total) / lookups, 4) if lookups else 0.0,
+            'latency_ms': {
+                'mean': round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+                'p50': round(percentile(0.50), 3),
+                'p95': round(percentile(0.95), 3),
+                'max': round(latencies[-1] * 1000, 3) if latencies else 0.0,
+            },
+        }
+
+    def shutdown(self) -> None:
+        """
+        Encerra o pool de workers.
+        """
+        self.executor.shutdown(wait=True)
+        logger.info("AllocationService encerrado.")
+
+
+class AllocationRequestHandler(BaseHTTPRequestHandler):
+    """
+    Expõe o AllocationService via HTTP:
+
+    - GET /health: verificação simples de disponibilidade.
+    - GET /stats: taxa de acerto do cache e latências.
+    - POST /allocate: corpo JSON com os parâmetros da alocação.
+    """
+
+    service = None
+
+    def _send_json(self, status: int, payload: dict) -> None:
+        self._send_body(status, json.dumps(payload, ensure_ascii=False).encode('utf-8'))
+
+    def _send_body(self, status: int, body: bytes) -> None:
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._send_json(200, {'status': 'ok'})
+        elif self.path == '/stats':
+            self._send_json(200, self.service.stats())
+        else:
+            self._send_json(404, {'error': f"Rota '{self.path}' não encontrada."})
+
+    def do_POST(self):
+        if self.path != '/allocate':
+            self._send_json(404, {'error': f"Rota '{self.path}' não encontrada."})
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            params = json.loads(self.rfile.read(length) or b'{}') if length else {}
+            if not isinstance(params, dict):
+                raise ValueError("O corpo do pedido deve ser um objeto JSON.")
+            self._send_body(200, self.service.allocate_json(params))
+        except ValueError as e:
+            self._send_json(400, {'error': str(e)})
+        except Exception as e:
+            logger.error("Erro ao processar pedido de alocação: %s", e)
+            self._send_json(500, {'error': str(e)})
+
+    def log_message(self, format, *args):
+        # Redireciona o log de acesso do http.server para o logger do projeto
+        logger.debug("%s - " + format, self.address_string(), *args)
+
+
+def run_server(host: str = '127.0.0.1', port: int = 8765, cache_size: int = 128, max_workers: int = 4,
+               config_path: str = None, cache_max_mb: float = 256) -> None:
+    """
+    Inicia o servidor HTTP local do serviço de alocação e bloqueia até ser interrompido.
+
+    Args:
+        host (str): Endereço de escuta. Padrão é apenas localhost.
+        port (int): Porta de escuta.
+        cache_size (int): Quantidade máxima de resultados no cache LRU.
+        max_workers (int): Quantidade de workers para otimizações simultâneas.
+        config_path (str, optional): Arquivo JSON que sobrescreve config/default_config.json.
+        cache_max_mb (float): Memória máxima ocupada pelas respostas em cache, em MB.
+    """
+    # O serviço é um processo de longa duração: escreve no seu próprio arquivo de log
+    configure_logging(log_name='allocation_service')
+    service = AllocationService(config=load_config(config_path), cache_size=cache_size, max_workers=max_workers,
+                                cache_max_mb=cache_max_mb)
+    handler = type('BoundAllocationRequestHandler', (AllocationRequestHandler,), {'service': service})
+    server = ThreadingHTTPServer((host, port), handler)
+    logger.info("Serviço de alocação disponível em http://%s:%s", host, port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Interrupção recebida. Encerrando o serviço de alocação...")
+    finally:
+        server.server_close()
+        service.shutdown()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serviço local de alocação de extensionistas com cache LRU.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--cache-size', type=int, default=128)
+    parser.add_argument('--cache-max-mb', type=float, default=256, help="Memória máxima das respostas em cache, em MB.")
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--config', help="Arquivo JSON que sobrescreve config/default_config.json.")
+    args = parser.parse_args()
+    run_server(host=args.host, port=args.port, cache_size=args.cache_size, max_workers=args.workers, config_path=args.config,
+               cache_max_mb=args.cache_max_mb)
@@ -0,0 +1,276 @@
+import json
+import os
+import platform
+import tempfile
+from datetime import datetime
+
+# Importa o logger e os componentes do pipeline
+try:
+    from .logger import setup_logger
+    from .config import load_config
+    from . import instrumentation
+    from .synthetic_data import synthetic_dataset_paths, write_synthetic_dataset
+    from .data_loader import load_exportation_data
+    from .geo_processor import GeoProcessor
+    from .clustering_model import ClusteringModel
+    from .summary_utils import summarize_producers_by_extensionist
+except ImportError:
+    import sys
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+    from src.utils.logger import setup_logger
+    from src.utils.config import load_config
+    from src.utils import instrumentation
+    from src.utils.synthetic_data import synthetic_dataset_paths, write_synthetic_dataset
+    from src.utils.data_loader import load_exportation_data
+    from src.utils.geo_processor import GeoProcessor
+    from src.utils.clustering_model import ClusteringModel
+    from src.utils.summary_utils import summarize_producers_by_extensionist
+
+logger = setup_logger()
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+BENCHMARK_DIR = os.path.join(PROJECT_ROOT, 'benchmarks')
+DEFAULT_BASELINE_PATH = os.path.join(BENCHMARK_DIR, 'baseline.json')
+DEFAULT_SIZES = (1000, 10000, 100000)
+BENCHMARK_STAGES = ('load_exportation_data', 'apply_immutability_rules', 'optimize_allocation', 'summarize_producers_by_extensionist')
+
+# Limite de linhas por etapa: os laços por núcleo/microrregião de optimize_allocation são superlineares
+STAGE_MAX_ROWS = {'optimize_allocation': 10000}
+
+# Diferenças absolutas abaixo destes valores são consideradas ruído de medição
+MIN_TIME_DELTA_S = 0.01
+MIN_MEMORY_DELTA_MB = 1.0
+
+
+def _run_pipeline(paths: dict, run_optimize: bool, output_dir: str, config: dict) -> None:
+    """
+    Executa as etapas do pipeline sobre um dataset sintético, com as regras, metas e backend de
+    clustering da configuração. As medições são feitas pelos decoradores de instrumentação de cada etapa.
+    """
+    df_data = load_exportation_data(paths['exportation'])
+    geo_processor = GeoProcessor(
+        immutability_rules=config['immutability_rules'],
+        immutable_producers_file=paths['immutable_producers'],
+        immutable_extensionists_file=paths['immutable_extensionists']
+    )
+    df_processed = geo_processor.apply_immutability_rules(df_data.copy())
+
+    if run_optimize:
+        clustering_model = ClusteringModel.from_config(config, df_processed['Extensionista_Atual'].unique().tolist())
+        df_optimized = clustering_model.optimize_allocation(df_processed.copy())
+    else:
+        # Sem otimização, a sumarização é medida sobre a alocação atual
+        df_optimized = df_processed.copy()
+        df_optimized['Extensionista_Proposto'] = df_optimized['Extensionista_Atual']
+
+    summarize_producers_by_extensionist(df_optimized, output_dir)
+
+
+def _collect(trace_memory: bool, paths: dict, run_optimize: bool, output_dir: str, config: dict) -> dict:
+    run = instrumentation.start_run(trace_memory=trace_memory)
+    try:
+        _run_pipeline(paths, run_optimize, output_dir, config)
+    finally:
+        instrumentation.finish_run(write=False)
+    return {record.name: record for record in run.records if record.path in BENCHMARK_STAGES}
+
+
+def benchmark_size(n_rows: int, repeat: int = 3, seed: int = 42, data_dir: str = None, memory: bool = True,
+                   stage_max_rows: dict = None, config: dict = None) -> dict:
+    """
+    Mede as etapas do pipeline para um dataset sintético de n_rows aviários.
+
+    Uma execução de aquecimento (não medida) absorve a importação tardia do scikit-learn e o
+    aquecimento de caches. O tempo reportado é o menor entre `repeat` execuções sem tracemalloc;
+    o pico de memória vem de uma execução adicional com tracemalloc ativo.
+
+    Args:
+        n_rows (int): Quantidade de aviários do dataset sintético.
+        repeat (int): Quantidade de execuções cronometradas.
+        seed (int): Semente do gerador de dados.
+        data_dir (str, optional): Diretório dos datasets sintéticos (reaproveitados entre execuções).
+        memory (bool): Se True, faz a execução adicional para medir o pico de memória.
+        stage_max_rows (dict, optional): Tamanho máximo por etapa. Padrão é STAGE_MAX_ROWS.
+        config (dict, optional): Configuração carregada por load_config. Padrão é config/default_config.json.
+
+    Returns:
+        dict: Medições por chave '<etapa>@<n_rows>'.
+    """
+    config = config or load_config()
+    data_dir = data_dir or os.path.join(BENCHMARK_DIR, 'data')
+    stage_max_rows = STAGE_MAX_ROWS if stage_max_rows is None else stage_max_rows
+    run_optimize = n_rows <= stage_max_rows.get('optimize_allocation', n_rows)
+
+    paths = synthetic_dataset_paths(n_rows, data_dir, seed=seed)
+    if all(os.path.exists(path) for path in paths.values()):
+        logger.info("Reaproveitando o dataset sintético existente: %s", paths['exportation'])
+    else:
+        paths = write_synthetic_dataset(n_rows, data_dir, seed=seed)
+    if not run_optimize:
+        logger.warning("optimize_allocation ignorado para %s linhas (limite de %s).", n_rows, stage_max_rows['optimize_allocation'])
+
+    results = {}
+    with tempfile.TemporaryDirectory() as output_dir:
+        # Sem execução instrumentada ativa, as etapas não são medidas
+        _run_pipeline(paths, run_optimize, output_dir, config)
+        for _ in range(max(1, repeat)):
+            for name, record in _collect(False, paths, run_optimize, output_dir, config).items():
+                entry = results.setdefault(f"{name}@{n_rows}", {'stage': name, 'n_rows': n_rows, 'rows': record.rows, 'wall_times_s': [], 'cpu_times_s': []})
+                entry['wall_times_s'].append(record.wall_time_s)
+                entry['cpu_times_s'].append(record.cpu_time_s)
+                entry['process_peak_rss_mb'] = record.process_peak_rss_mb
+        if memory:
+            for name, record in _collect(True, paths, run_optimize, output_dir, config).items():
+                results[f"{name}@{n_rows}"]['tracemalloc_peak_mb'] = record.tracemalloc_peak_mb
+
+    for entry in results.values():
+        entry['wall_time_s'] = min(entry['wall_times_s'])
+        entry['cpu_time_s'] = min(entry['cpu_times_s'])
+    return results
+
+
+def compare_with_baseline(results: dict, baseline: dict, threshold: float = 0.25) -> list:
+    """
+    Compara as medições com a baseline e retorna as regressões acima do limiar relativo.
+
+    Args:
+        results (dict): Medições atuais por chave '<etapa>@<n_rows>'.
+        baseline (dict): Medições de referência no mesmo formato.
+        threshold (float): Aumento relativo tolerado (0.25 = 25%).
+
+    Returns:
+        list: Dicionários descrevendo cada regressão encontrada.
+    """
+    regressions = []
+    for key, current in results.items():
+        reference = baseline.get(key)
+        if reference is None:
+            continue
+        checks = (('wall_time_s', MIN_TIME_DELTA_S), ('tracemalloc_peak_mb', MIN_MEMORY_DELTA_MB))
+        for metric, min_delta in checks:
+            old, new = reference.get(metric), current.get(metric)
+            if old is None or new is None:
+                continue
+            if new > old * (1 + threshold) and new - old > min_delta:
+                regressions.append({'key': key, 'metric': metric, 'baseline': old, 'current': new,
+                                    'ratio': round(new / old, 3) if old else None})
+    return regressions
+
+
+def _format_report(results: dict, baseline: dict) -> str:
+    lines = [f"{'Etapa':<40} {'Linhas':>9} {'Tempo (s)':>11} {'CPU (s)':>9} {'Pico (MB)':>10} {'vs. base':>9}"]
+    for key in sorted(results, key=lambda k: (results[k]['n_rows'], BENCHMARK_STAGES.index(results[k]['stage']))):
+        entry = results[key]
+        reference = baseline.get(key, {}).get('wall_time_s')
+        ratio = f"{entry['wall_time_s'] / reference:.2f}x" if reference else '-'
+        peak = entry.get('tracemalloc_peak_mb')
+        lines.append(f"{entry['stage']:<40} {entry['n_rows']:>9} {entry['wall_time_s']:>11.4f} {entry['cpu_time_s']:>9.4f} "
+                     f"{(f'{peak:.2f}' if peak is not None else '-'):>10} {ratio:>9}")
+    return '\n'.join(lines)
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, repeat: int = 3, seed: int = 42, threshold: float = 0.25,
+                   baseline_path: str = DEFAULT_BASELINE_PATH, update_baseline: bool = False, memory: bool = True,
+                   stage_max_rows: dict = None, config: dict = None) -> dict:
+    """
+    Executa o benchmark para cada tamanho, grava os resultados e sinaliza regressões contra a baseline.
+
+    Se a baseline não existir, os resultados atuais são gravados como baseline.
+
+    Args:
+        sizes (iterable): Tamanhos (quantidade de aviários) dos datasets sintéticos.
+        repeat (int): Quantidade de execuções cronometradas por tamanho.
+        seed (int): Semente do gerador de dados.
+        threshold (float): Aumento relativo tolerado antes de sinalizar regressão.
+        baseline_path (str): Caminho do JSON de baseline.
+        update_baseline (bool): Se True, substitui a baseline pelos resultados atuais.
+        memory (bool): Se True, mede o pico de memória com tracemalloc.
+        stage_max_rows (dict, optional): Tamanho máximo por etapa. Padrão é STAGE_MAX_ROWS.
+        config (dict, optional): Configuração carregada por load_config. Padrão é config/default_config.json.
+
+    Returns:
+        dict: Relatório com 'results', 'regressions' e 'results_file'.
+    """
+    config = config or load_config()
+    results = {}
+    for n_rows in sizes:
+        logger.info("Executando benchmark com %s aviários...", n_rows)
+        results.update(benchmark_size(n_rows, repeat=repeat, seed=seed, memory=memory, stage_max_rows=stage_max_rows,
+                                      config=config))
+
+    report = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python_version': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': seed,
+        'repeat': repeat,
+        'results': results,
+    }
+
+    baseline = {}
+    if os.path.exists(baseline_path):
+        with open(baseline_path, encoding='utf-8') as f:
+            baseline = json.load(f).get('results', {})
+
+    regressions = compare_with_baseline(results, baseline, threshold)
+    for regression in regressions:
+        logger.warning("Regressão em %s (%s): %s -> %s (%sx).", regression['key'], regression['metric'],
+                       regression['baseline'], regression['current'], regression['ratio'])
+
+    results_dir = os.path.join(BENCHMARK_DIR, 'results')
+    os.makedirs(results_dir, exist_ok=True)
+    results_file = os.path.join(results_dir, f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(results_file, 'w', encoding='utf-8') as f:
+        json.dump(dict(report, regressions=regressions), f, ensure_ascii=False, indent=2)
+    logger.info("Resultados do benchmark exportados para: %s", results_file)
+
+    if update_baseline or not baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(baseline_path)), exist_ok=True)
+        with open(baseline_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        logger.info("Baseline do benchmark gravada em: %s", baseline_path)
+
+    print(_format_report(results, baseline))
+    return {'results': results, 'regressions': regressions, 'results_file': results_file}
+
+
+def main(argv=None, config: dict = None) -> int:
+    """
+    Entrada de linha de comando do benchmark.
+
+    Args:
+        argv (list, optional): Argumentos da linha de comando.
+        config (dict, optional): Configuração já carregada (usada pelo `main.py benchmark`). Se omitida,
+                                 é carregada de --config.
+    """
+    import argparse
+
+    try:
+        from .logger import configure_logging
+    except ImportError:
+        from src.utils.logger import configure_logging
+
+    parser = argparse.ArgumentParser(description="Benchmark das etapas do pipeline com datasets sintéticos.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--threshold', type=float, default=0.25, help="Aumento relativo tolerado (0.25 = 25%%).")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE_PATH)
+    parser.add_argument('--update-baseline', action='store_true')
+    parser.add_argument('--no-memory', action='store_true', help="Não mede o pico de memória com tracemalloc.")
+    parser.add_argument('--max-optimize-rows', type=int, default=STAGE_MAX_ROWS['optimize_allocation'])
+    parser.add_argument('--config', help="Arquivo JSON que sobrescreve config/default_config.json.")
+    args = parser.parse_args(argv)
+    config = config or load_config(args.config)
+
+    # O pipeline registra muitas mensagens INFO; durante o benchmark, apenas avisos interessam
+    configure_logging(level='WARNING', log_name='benchmark')
+    report = run_benchmarks(sizes=args.sizes, repeat=args.repeat, seed=args.seed, threshold=args.threshold,
+                            baseline_path=args.baseline, update_baseline=args.update_baseline,
+                            memory=not args.no_memory, stage_max_rows={'optimize_allocation': args.max_optimize_rows},
+                            config=config)
+    return 1 if report['regressions'] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
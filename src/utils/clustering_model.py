@@ -1,16 +1,19 @@
 import pandas as pd
 import numpy as np
-from sklearn.cluster import KMeans # Exemplo de algoritmo de clustering
 import os
 
 # Importa o logger
 try:
     from .logger import setup_logger
+    from .config import SUPPORTED_BACKENDS
+    from .instrumentation import instrumented, stage
 except ImportError:
     import sys
     import os
     sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
     from src.utils.logger import setup_logger
+    from src.utils.config import SUPPORTED_BACKENDS
+    from src.utils.instrumentation import instrumented, stage
 
 logger = setup_logger()
 
@@ -19,7 +22,8 @@ class ClusteringModel:
     Implementa o algoritmo de otimização para alocação de aviários, aplicando as premissas e restrições.
     """
 
-    def __init__(self, target_aviaries_min: int = 40, target_aviaries_max: int = 43, current_extensionists: list = None, desired_avg_aviaries_per_extensionist: int = None):
+    def __init__(self, target_aviaries_min: int = 40, target_aviaries_max: int = 43, current_extensionists: list = None, desired_avg_aviaries_per_extensionist: int = None,
+                 clustering_backend: str = 'kmeans', batch_size: int = 4096, coreset_size: int = None, minibatch_threshold_rows: int = 50000):
         """
         Inicializa o modelo de clustering com a meta operacional de aviários por extensionista.
 
@@ -28,12 +32,49 @@ class ClusteringModel:
             target_aviaries_max (int): Número máximo de aviários por extensionista.
             current_extensionists (list, optional): Lista de nomes dos extensionistas atuais.
             desired_avg_aviaries_per_extensionist (int, optional): Média desejada de aviários por extensionista, se fornecida pelo usuário.
+            clustering_backend (str): 'kmeans' (KMeans completo, n_init=10), 'minibatch' (MiniBatchKMeans sobre
+                                      coordenadas compactas em float32) ou 'auto' (minibatch a partir de minibatch_threshold_rows).
+            batch_size (int): Tamanho dos lotes do backend minibatch e da passada de atribuição.
+            coreset_size (int, optional): Se informado, uma amostra deste tamanho é clusterizada primeiro para semear os centróides.
+            minibatch_threshold_rows (int): Quantidade de aviários a partir da qual o backend 'auto' usa minibatch.
         """
+        if clustering_backend not in SUPPORTED_BACKENDS:
+            raise ValueError(f"Backend de clustering '{clustering_backend}' não suportado. Opções: {list(SUPPORTED_BACKENDS)}.")
         self.target_aviaries_min = target_aviaries_min
         self.target_aviaries_max = target_aviaries_max
         self.current_extensionists = sorted(current_extensionists) if current_extensionists is not None else []
         self.desired_avg_aviaries_per_extensionist = desired_avg_aviaries_per_extensionist
-        logger.info(f"ClusteringModel inicializado com meta de aviários por extensionista: {target_aviaries_min}-{target_aviaries_max}. Desejado: {desired_avg_aviaries_per_extensionist}.")
+        self.clustering_backend = clustering_backend
+        self.batch_size = batch_size
+        self.coreset_size = coreset_size
+        self.minibatch_threshold_rows = minibatch_threshold_rows
+        self.last_clustering_quality = None
+        logger.info("ClusteringModel inicializado com meta de aviários por extensionista: %s-%s. Desejado: %s. Backend: %s.", target_aviaries_min, target_aviaries_max, desired_avg_aviaries_per_extensionist, clustering_backend)
+
+    @classmethod
+    def from_config(cls, config: dict, current_extensionists: list = None, **overrides) -> 'ClusteringModel':
+        """
+        Cria o modelo a partir das seções 'targets' e 'clustering' da configuração (ver load_config).
+
+        Args:
+            config (dict): Configuração carregada por load_config.
+            current_extensionists (list, optional): Lista de nomes dos extensionistas atuais.
+            **overrides: Argumentos do construtor que substituem os valores da configuração
+                         (ex.: clustering_backend ou as metas de um pedido do serviço).
+        """
+        targets = config['targets']
+        clustering = config['clustering']
+        kwargs = {
+            'target_aviaries_min': targets['target_aviaries_min'],
+            'target_aviaries_max': targets['target_aviaries_max'],
+            'desired_avg_aviaries_per_extensionist': targets.get('desired_avg_aviaries_per_extensionist'),
+            'clustering_backend': clustering['backend'],
+            'batch_size': clustering['batch_size'],
+            'coreset_size': clustering.get('coreset_size'),
+            'minibatch_threshold_rows': clustering['minibatch_threshold_rows'],
+        }
+        kwargs.update(overrides)
+        return cls(current_extensionists=current_extensionists, **kwargs)
 
     def _calculate_num_extensionists(self, total_aviaries: int) -> int:
         """
@@ -41,15 +82,154 @@ class ClusteringModel:
         """
         if self.desired_avg_aviaries_per_extensionist is not None and self.desired_avg_aviaries_per_extensionist > 0:
             num_ext = int(np.ceil(total_aviaries / self.desired_avg_aviaries_per_extensionist))
-            logger.info(f"Calculado número ideal de extensionistas: {num_ext} para {total_aviaries} aviários, usando média desejada de {self.desired_avg_aviaries_per_extensionist}.")
+            logger.info("Calculado número ideal de extensionistas: %s para %s aviários, usando média desejada de %s.", num_ext, total_aviaries, self.desired_avg_aviaries_per_extensionist)
         else:
             if self.target_aviaries_max <= 0:
                 logger.error("target_aviaries_max deve ser maior que zero para calcular o número de extensionistas.")
                 return 1 # Fallback
             num_ext = int(np.ceil(total_aviaries / ((self.target_aviaries_min + self.target_aviaries_max) / 2)))
-            logger.info(f"Calculado número ideal de extensionistas: {num_ext} para {total_aviaries} aviários, usando meta min/max.")
+            logger.info("Calculado número ideal de extensionistas: %s para %s aviários, usando meta min/max.", num_ext, total_aviaries)
         return num_ext
 
+    def _resolve_backend(self, n_rows: int) -> str:
+        if self.clustering_backend == 'auto':
+            return 'minibatch' if n_rows >= self.minibatch_threshold_rows else 'kmeans'
+        return self.clustering_backend
+
+    @staticmethod
+    def _extract_coordinates(df: pd.DataFrame) -> np.ndarray:
+        """
+        Retorna as coordenadas (latitude, longitude) como array numérico, usando as colunas
+        numéricas quando disponíveis e recorrendo ao parse da coluna 'Coordenadas' caso contrário.
+        """
+        if 'Latitude' in df.columns and 'Longitude' in df.columns:
+            return df[['Latitude', 'Longitude']].to_numpy(dtype=np.float64)
+        return df['Coordenadas'].str.split(',', expand=True).astype(float).values
+
+    def _assign_in_chunks(self, coords: np.ndarray, centers: np.ndarray) -> np.ndarray:
+        """
+        Atribui cada ponto ao centróide mais próximo em blocos. A matriz de distâncias é calculada
+        em um único buffer pré-alocado de cerca de 4 milhões de elementos, independentemente do
+        tamanho da entrada e da quantidade de centróides.
+        """
+        labels = np.empty(len(coords), dtype=np.int32)
+        centers_t = np.ascontiguousarray(centers.T)
+        centers_sq = (centers ** 2).sum(axis=1)
+        chunk_rows = max(1, (1 << 22) // max(1, len(centers)))
+        buffer = np.empty((min(chunk_rows, len(coords)), len(centers)), dtype=np.result_type(coords, centers))
+        for start in range(0, len(coords), chunk_rows):
+            chunk = coords[start:start + chunk_rows]
+            distances = buffer[:len(chunk)]
+            # ||x - c||² = ||x||² - 2x·c + ||c||²; ||x||² é constante por linha e não altera o argmin
+            np.matmul(chunk, centers_t, out=distances)
+            distances *= -2
+            distances += centers_sq
+            labels[start:start + chunk_rows] = distances.argmin(axis=1)
+        return labels
+
+    def _fit_minibatch(self, coords: np.ndarray, n_clusters: int) -> np.ndarray:
+        """
+        MiniBatchKMeans sobre coordenadas centralizadas em float32, com semeadura opcional por amostra
+        (coreset) e uma única passada final de atribuição em blocos.
+        """
+        from sklearn.cluster import KMeans, MiniBatchKMeans
+
+        # Coordenadas centralizadas: em float32, valores próximos de zero preservam a precisão das distâncias
+        compact = (coords - coords.mean(axis=0)).astype(np.float32)
+        init = 'k-means++'
+        n_init = 3
+        if self.coreset_size and self.coreset_size < len(compact) and self.coreset_size >= n_clusters:
+            rng = np.random.default_rng(42)
+            sample = compact[rng.choice(len(compact), size=self.coreset_size, replace=False)]
+            init = KMeans(n_clusters=n_clusters, random_state=42, n_init=1).fit(sample).cluster_centers_
+            n_init = 1
+        # Lotes com poucos pontos por centróide e a reatribuição aleatória de clusters pequenos degradam
+        # muito a inércia quando há milhares de clusters
+        batch_size = max(self.batch_size, 4 * n_clusters)
+        model = MiniBatchKMeans(n_clusters=n_clusters, batch_size=batch_size, init=init, n_init=n_init,
+                                reassignment_ratio=0.0, random_state=42, compute_labels=False)
+        model.fit(compact)
+        return self._assign_in_chunks(compact, model.cluster_centers_.astype(np.float32))
+
+    def _fit_predict(self, coords: np.ndarray, n_clusters: int) -> np.ndarray:
+        """
+        Executa o clustering com o backend configurado e retorna o rótulo de cada aviário.
+        """
+        if self._resolve_backend(len(coords)) == 'minibatch':
+            return self._fit_minibatch(coords, n_clusters)
+        from sklearn.cluster import KMeans
+        return KMeans(n_clusters=n_clusters, random_state=42, n_init=10).fit_predict(coords) # n_init para evitar warnings
+
+    def evaluate_clustering(self, coords: np.ndarray, labels: np.ndarray) -> dict:
+        """
+        Mede a qualidade de uma partição: inércia (soma das distâncias quadráticas aos centróides)
+        e violações de capacidade em relação à meta de aviários por extensionista.
+
+        Args:
+            coords (np.ndarray): Coordenadas (latitude, longitude) dos aviários.
+            labels (np.ndarray): Cluster atribuído a cada aviário.
+
+        Returns:
+            dict: 'inertia', 'n_clusters', 'clusters_below_min', 'clusters_above_max' e 'aviaries_above_max'.
+        """
+        labels = np.asarray(labels)
+        valid = labels >= 0
+        coords, labels = coords[valid], labels[valid]
+        n_clusters = int(labels.max()) + 1 if len(labels) else 0
+        sizes = np.bincount(labels, minlength=n_clusters)
+        present = sizes > 0
+        centroids = np.zeros((n_clusters, coords.shape[1]))
+        for dim in range(coords.shape[1]):
+            centroids[present, dim] = np.bincount(labels, weights=coords[:, dim], minlength=n_clusters)[present] / sizes[present]
+        inertia = float(((coords - centroids[labels]) ** 2).sum())
+        sizes = sizes[present]
+        return {
+            'inertia': inertia,
+            'n_clusters': int(present.sum()),
+            'clusters_below_min': int((sizes < self.target_aviaries_min).sum()),
+            'clusters_above_max': int((sizes > self.target_aviaries_max).sum()),
+            'aviaries_above_max': int(np.clip(sizes - self.target_aviaries_max, 0, None).sum()),
+        }
+
+    def compare_backends(self, df: pd.DataFrame, n_clusters: int = None) -> dict:
+        """
+        Clusteriza os mesmos aviários com os backends 'kmeans' e 'minibatch' e reporta a diferença
+        de qualidade (inércia e violações de capacidade) e de tempo, para apoiar a escolha do backend.
+
+        Args:
+            df (pd.DataFrame): DataFrame com as coordenadas dos aviários.
+            n_clusters (int, optional): Número de clusters. Padrão: calculado a partir da meta.
+
+        Returns:
+            dict: Métricas por backend e a diferença relativa de inércia do minibatch ('inertia_gap').
+        """
+        import time
+
+        coords = self._extract_coordinates(df)
+        n_clusters = n_clusters or self._calculate_num_extensionists(len(coords))
+        original_backend = self.clustering_backend
+        report = {'n_rows': len(coords), 'n_clusters': n_clusters}
+        try:
+            for backend in ('kmeans', 'minibatch'):
+                self.clustering_backend = backend
+                start = time.perf_counter()
+                labels = self._fit_predict(coords, n_clusters)
+                elapsed = time.perf_counter() - start
+                report[backend] = dict(self.evaluate_clustering(coords, labels), wall_time_s=round(elapsed, 4))
+        finally:
+            self.clustering_backend = original_backend
+
+        full_inertia = report['kmeans']['inertia']
+        report['inertia_gap'] = (report['minibatch']['inertia'] - full_inertia) / full_inertia if full_inertia else 0.0
+        logger.info("Comparação de backends (%s aviários, %s clusters): inércia kmeans=%.6f, minibatch=%.6f (gap %.2f%%); "
+                    "clusters fora da meta kmeans=%s, minibatch=%s; tempo kmeans=%.3fs, minibatch=%.3fs.",
+                    report['n_rows'], n_clusters, full_inertia, report['minibatch']['inertia'], report['inertia_gap'] * 100,
+                    report['kmeans']['clusters_below_min'] + report['kmeans']['clusters_above_max'],
+                    report['minibatch']['clusters_below_min'] + report['minibatch']['clusters_above_max'],
+                    report['kmeans']['wall_time_s'], report['minibatch']['wall_time_s'])
+        return report
+
+    @instrumented()
     def optimize_allocation(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Implementa o algoritmo de otimização para alocação de aviários.
@@ -77,7 +257,9 @@ class ClusteringModel:
             return df_result
 
         # Converter coordenadas para formato numérico
-        coords = df_result['Coordenadas'].str.split(',', expand=True).astype(float).values
+        coords = self._extract_coordinates(df_result)
+        backend = self._resolve_backend(len(coords))
+        logger.info("Backend de clustering: %s.", backend)
 
         # 1. Calcular número de extensionistas necessários
         total_aviaries = len(df_result)
@@ -87,34 +269,36 @@ class ClusteringModel:
         # TODO: A escolha do algoritmo e a integração das restrições (continuidade, núcleos) é complexa.
         # KMeans é um placeholder e não garante continuidade ou integralidade de núcleos diretamente.
         if num_extensionists > 0 and len(coords) >= num_extensionists:
-            kmeans = KMeans(n_clusters=num_extensionists, random_state=42, n_init=10) # n_init para evitar warnings
-            df_result['cluster'] = kmeans.fit_predict(coords)
-            logger.info(f"Clustering inicial com {num_extensionists} clusters realizado.")
+            with stage('initial_kmeans', rows=len(coords), n_clusters=num_extensionists, backend=backend):
+                df_result['cluster'] = self._fit_predict(coords, num_extensionists)
+            logger.info("Clustering inicial com %s clusters realizado.", num_extensionists)
         else:
-            logger.warning(f"Não foi possível realizar clustering. num_extensionists={num_extensionists}, len(coords)={len(coords)}.")
+            logger.warning("Não foi possível realizar clustering. num_extensionists=%s, len(coords)=%s.", num_extensionists, len(coords))
             df_result['cluster'] = -1 # Indicar que não houve clustering
 
         # 3. Garantir a integralidade dos núcleos (Restrição 4)
         # Se um núcleo for dividido entre clusters, reatribuir todos os aviários do núcleo ao cluster majoritário.
         if 'ID_Nucleo' in df_result.columns:
-            for nucleo_id in df_result['ID_Nucleo'].unique():
-                nucleo_aviaries = df_result[df_result['ID_Nucleo'] == nucleo_id]
-                if not nucleo_aviaries.empty:
-                    # Encontra o cluster mais comum para este núcleo
-                    most_common_cluster = nucleo_aviaries['cluster'].mode()[0]
-                    df_result.loc[df_result['ID_Nucleo'] == nucleo_id, 'cluster'] = most_common_cluster
+            with stage('nucleus_integrity', rows=len(df_result), phase='initial'):
+                for nucleo_id in df_result['ID_Nucleo'].unique():
+                    nucleo_aviaries = df_result[df_result['ID_Nucleo'] == nucleo_id]
+                    if not nucleo_aviaries.empty:
+                        # Encontra o cluster mais comum para este núcleo
+                        most_common_cluster = nucleo_aviaries['cluster'].mode()[0]
+                        df_result.loc[df_result['ID_Nucleo'] == nucleo_id, 'cluster'] = most_common_cluster
             logger.info("Integralidade dos núcleos garantida.")
 
         # 4. Priorizar o fechamento de microrregiões (Restrição 5)
         # Similar à integralidade dos núcleos, mas para microrregiões. Pode ser mais complexo.
         if 'Microrregiao' in df_result.columns:
-            for microrregiao_id in df_result['Microrregiao'].unique():
-                if microrregiao_id == 'PENDENTE': # Ignorar PENDENTE conforme premissa
-                    continue
-                microrregiao_aviaries = df_result[df_result['Microrregiao'] == microrregiao_id]
-                if not microrregiao_aviaries.empty:
-                    most_common_cluster = microrregiao_aviaries['cluster'].mode()[0]
-                    df_result.loc[df_result['Microrregiao'] == microrregiao_id, 'cluster'] = most_common_cluster
+            with stage('microregion_closure', rows=len(df_result), phase='initial'):
+                for microrregiao_id in df_result['Microrregiao'].unique():
+                    if microrregiao_id == 'PENDENTE': # Ignorar PENDENTE conforme premissa
+                        continue
+                    microrregiao_aviaries = df_result[df_result['Microrregiao'] == microrregiao_id]
+                    if not microrregiao_aviaries.empty:
+                        most_common_cluster = microrregiao_aviaries['cluster'].mode()[0]
+                        df_result.loc[df_result['Microrregiao'] == microrregiao_id, 'cluster'] = most_common_cluster
             logger.info("Priorização de fechamento de microrregiões aplicada.")
 
         # 5. Balanceamento da carga de demanda (Restrição 6 - baixa prioridade)
@@ -139,27 +323,27 @@ class ClusteringModel:
         # Loop de ajuste
         for iteration in range(20): # Limitar iterações para evitar loops infinitos
             if current_n_clusters <= 0 or current_n_clusters > total_aviaries:
-                logger.warning(f"Número de clusters inválido: {current_n_clusters}. Ajustando para {max(1, min(total_aviaries, current_n_clusters))}.")
+                logger.warning("Número de clusters inválido: %s. Ajustando para %s.", current_n_clusters, max(1, min(total_aviaries, current_n_clusters)))
                 current_n_clusters = max(1, min(total_aviaries, current_n_clusters))
 
             if len(coords) < current_n_clusters:
-                logger.warning(f"Não há aviários suficientes ({len(coords)}) para {current_n_clusters} clusters. Reduzindo clusters para {len(coords)}.")
+                logger.warning("Não há aviários suficientes (%s) para %s clusters. Reduzindo clusters para %s.", len(coords), current_n_clusters, len(coords))
                 current_n_clusters = len(coords)
                 if current_n_clusters == 0: # Evitar KMeans com 0 clusters
                     break
 
-            kmeans = KMeans(n_clusters=current_n_clusters, random_state=42, n_init=10) # n_init para evitar warnings
             df_temp = df_result.copy()
-            df_temp['cluster'] = kmeans.fit_predict(coords)
+            with stage('kmeans_iteration', rows=len(coords), iteration=iteration, n_clusters=current_n_clusters, backend=backend):
+                df_temp['cluster'] = self._fit_predict(coords, current_n_clusters)
 
             avg_aviaries_per_ext = total_aviaries / current_n_clusters
-            logger.info(f"Iteração {iteration}: n_clusters={current_n_clusters}, Avg Aviaries={avg_aviaries_per_ext:.2f}")
+            logger.info("Iteração %s: n_clusters=%s, Avg Aviaries=%.2f", iteration, current_n_clusters, avg_aviaries_per_ext)
 
             # Verificar se a média está dentro do range desejado
             if self.target_aviaries_min <= avg_aviaries_per_ext <= self.target_aviaries_max:
                 best_df_result = df_temp
                 best_n_clusters = current_n_clusters
-                logger.info(f"Meta de aviários por extensionista atingida com {current_n_clusters} clusters.")
+                logger.info("Meta de aviários por extensionista atingida com %s clusters.", current_n_clusters)
                 break
 
             # Ajustar n_clusters para a próxima iteração
@@ -175,39 +359,47 @@ class ClusteringModel:
             best_n_clusters = current_n_clusters # Atualizar para a próxima comparação
 
         df_result = best_df_result
-        logger.info(f"Clustering final com {best_n_clusters} clusters realizado. Média de aviários por extensionista: {total_aviaries / best_n_clusters:.2f}")
+        logger.info("Clustering final com %s clusters realizado. Média de aviários por extensionista: %.2f", best_n_clusters, total_aviaries / best_n_clusters)
+
+        # Qualidade da partição antes das reconciliações por núcleo e microrregião
+        self.last_clustering_quality = dict(self.evaluate_clustering(coords, df_result['cluster'].to_numpy()), backend=backend)
+        logger.info("Qualidade do clustering (%s): inércia=%.6f, clusters abaixo da meta=%s, acima da meta=%s, aviários excedentes=%s.",
+                    backend, self.last_clustering_quality['inertia'], self.last_clustering_quality['clusters_below_min'],
+                    self.last_clustering_quality['clusters_above_max'], self.last_clustering_quality['aviaries_above_max'])
 
         # 3. Garantir a integralidade dos núcleos (Restrição 4)
         # Se um núcleo for dividido entre clusters, reatribuir todos os aviários do núcleo ao cluster majoritário.
         if 'ID_Nucleo' in df_result.columns:
-            for nucleo_id in df_result['ID_Nucleo'].unique():
-                nucleo_aviaries = df_result[df_result['ID_Nucleo'] == nucleo_id]
-                if not nucleo_aviaries.empty:
-                    # Encontra o cluster mais comum para este núcleo
-                    # Excluir -1 (não clusterizado) se houver
-                    valid_clusters = nucleo_aviaries[nucleo_aviaries['cluster'] != -1]['cluster']
-                    if not valid_clusters.empty:
-                        most_common_cluster = valid_clusters.mode()[0]
-                        df_result.loc[df_result['ID_Nucleo'] == nucleo_id, 'cluster'] = most_common_cluster
-                    else:
-                        logger.warning(f"Núcleo {nucleo_id} não possui aviários clusterizados. Mantendo cluster original ou -1.")
+            with stage('nucleus_integrity', rows=len(df_result), phase='final'):
+                for nucleo_id in df_result['ID_Nucleo'].unique():
+                    nucleo_aviaries = df_result[df_result['ID_Nucleo'] == nucleo_id]
+                    if not nucleo_aviaries.empty:
+                        # Encontra o cluster mais comum para este núcleo
+                        # Excluir -1 (não clusterizado) se houver
+                        valid_clusters = nucleo_aviaries[nucleo_aviaries['cluster'] != -1]['cluster']
+                        if not valid_clusters.empty:
+                            most_common_cluster = valid_clusters.mode()[0]
+                            df_result.loc[df_result['ID_Nucleo'] == nucleo_id, 'cluster'] = most_common_cluster
+                        else:
+                            logger.warning("Núcleo %s não possui aviários clusterizados. Mantendo cluster original ou -1.", nucleo_id)
             logger.info("Integralidade dos núcleos garantida.")
 
         # 4. Priorizar o fechamento de microrregiões (Restrição 5)
         # Similar à integralidade dos núcleos, mas para microrregiões. Pode ser mais complexo.
         if 'Microrregiao' in df_result.columns:
-            for microrregiao_id in df_result['Microrregiao'].unique():
-                if microrregiao_id == 'PENDENTE': # Ignorar PENDENTE conforme premissa
-                    continue
-                microrregiao_aviaries = df_result[df_result['Microrregiao'] == microrregiao_id]
-                if not microrregiao_aviaries.empty:
-                    # Excluir -1 (não clusterizado) se houver
-                    valid_clusters = microrregiao_aviaries[microrregiao_aviaries['cluster'] != -1]['cluster']
-                    if not valid_clusters.empty:
-                        most_common_cluster = valid_clusters.mode()[0]
-                        df_result.loc[df_result['Microrregiao'] == microrregiao_id, 'cluster'] = most_common_cluster
-                    else:
-                        logger.warning(f"Microrregião {microrregiao_id} não possui aviários clusterizados. Mantendo cluster original ou -1.")
+            with stage('microregion_closure', rows=len(df_result), phase='final'):
+                for microrregiao_id in df_result['Microrregiao'].unique():
+                    if microrregiao_id == 'PENDENTE': # Ignorar PENDENTE conforme premissa
+                        continue
+                    microrregiao_aviaries = df_result[df_result['Microrregiao'] == microrregiao_id]
+                    if not microrregiao_aviaries.empty:
+                        # Excluir -1 (não clusterizado) se houver
+                        valid_clusters = microrregiao_aviaries[microrregiao_aviaries['cluster'] != -1]['cluster']
+                        if not valid_clusters.empty:
+                            most_common_cluster = valid_clusters.mode()[0]
+                            df_result.loc[df_result['Microrregiao'] == microrregiao_id, 'cluster'] = most_common_cluster
+                        else:
+                            logger.warning("Microrregião %s não possui aviários clusterizados. Mantendo cluster original ou -1.", microrregiao_id)
             logger.info("Priorização de fechamento de microrregiões aplicada.")
 
         # 5. Balanceamento da carga de demanda (Restrição 6 - baixa prioridade)
@@ -232,7 +424,7 @@ class ClusteringModel:
                         if most_common_ext in self.current_extensionists and most_common_ext not in assigned_current_extensionists:
                             final_extensionist_mapping[cluster_id] = most_common_ext
                             assigned_current_extensionists.add(most_common_ext)
-                            logger.info(f"Cluster {cluster_id} mapeado para extensionista atual: {most_common_ext}")
+                            logger.info("Cluster %s mapeado para extensionista atual: %s", cluster_id, most_common_ext)
 
         # Preencher os clusters restantes e lidar com excesso/déficit de extensionistas
         remaining_clusters = sorted([c for c in df_result['cluster'].unique() if c not in final_extensionist_mapping])
@@ -245,13 +437,13 @@ class ClusteringModel:
                 # Atribuir clusters restantes a extensionistas atuais não atribuídos
                 ext_to_assign = available_current_extensionists.pop(0)
                 final_extensionist_mapping[cluster_id] = ext_to_assign
-                logger.info(f"Cluster {cluster_id} mapeado para extensionista atual restante: {ext_to_assign}")
+                logger.info("Cluster %s mapeado para extensionista atual restante: %s", cluster_id, ext_to_assign)
             else:
                 # Criar novas regiões para clusters sem extensionista atual
                 new_region_name = f"Região {chr(65 + new_region_counter)}"
                 final_extensionist_mapping[cluster_id] = new_region_name
                 new_region_counter += 1
-                logger.info(f"Cluster {cluster_id} mapeado para nova região: {new_region_name}")
+                logger.info("Cluster %s mapeado para nova região: %s", cluster_id, new_region_name)
 
         # Atribuir nomes aos novos extensionistas propostos
         df_result['Extensionista_Proposto'] = df_result['cluster'].map(final_extensionist_mapping)
@@ -299,6 +491,6 @@ if __name__ == "__main__":
         os.makedirs(exports_dir, exist_ok=True)
         output_file_path = os.path.join(exports_dir, 'clustering_model_output.csv')
         df_optimized.to_csv(output_file_path, sep=';', decimal='.', index=False)
-        logger.info(f"DataFrame otimizado exportado para: {output_file_path}")
+        logger.info("DataFrame otimizado exportado para: %s", output_file_path)
     else:
         logger.error("Não foi possível carregar os dados reais para teste do ClusteringModel.")
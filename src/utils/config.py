@@ -0,0 +1,71 @@
+import copy
+import json
+import os
+
+# Importa o logger
+try:
+    from .logger import setup_logger
+except ImportError:
+    import sys
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+    from src.utils.logger import setup_logger
+
+logger = setup_logger()
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+DEFAULT_CONFIG_PATH = os.path.join(PROJECT_ROOT, 'config', 'default_config.json')
+
+# Backends aceitos pelo ClusteringModel. Definidos aqui, e não em clustering_model.py, para que a CLI
+# possa validá-los sem importar pandas e scikit-learn
+SUPPORTED_BACKENDS = ('kmeans', 'minibatch', 'auto')
+
+
+def _deep_merge(base: dict, override: dict) -> dict:
+    """
+    Mescla recursivamente `override` sobre `base`. Listas e valores escalares são substituídos.
+    """
+    merged = copy.deepcopy(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _deep_merge(merged[key], value)
+        else:
+            merged[key] = copy.deepcopy(value)
+    return merged
+
+
+def load_config(config_path: str = None) -> dict:
+    """
+    Carrega os parâmetros do pipeline (arquivos de dados, regras de imutabilidade, metas e exportação).
+
+    Os valores de config/default_config.json são usados como base e o arquivo informado
+    só precisa conter as chaves que deseja sobrescrever.
+
+    Args:
+        config_path (str, optional): Caminho de um arquivo JSON de configuração.
+
+    Returns:
+        dict: Configuração completa.
+
+    Raises:
+        FileNotFoundError: Se o arquivo de configuração informado não existir.
+        ValueError: Se o arquivo não contiver um objeto JSON válido.
+    """
+    with open(DEFAULT_CONFIG_PATH, encoding='utf-8') as f:
+        config = json.load(f)
+
+    if config_path:
+        try:
+            with open(config_path, encoding='utf-8') as f:
+                user_config = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Arquivo de configuração '{config_path}' inválido: {e}") from e
+        if not isinstance(user_config, dict):
+            raise ValueError(f"Arquivo de configuração '{config_path}' deve conter um objeto JSON.")
+        config = _deep_merge(config, user_config)
+        logger.info("Configuração carregada de: %s", config_path)
+
+    # O diretório de exportação relativo é resolvido a partir da raiz do projeto
+    exports_dir = config['exports']['directory']
+    if not os.path.isabs(exports_dir):
+        config['exports']['directory'] = os.path.join(PROJECT_ROOT, exports_dir)
+    return config
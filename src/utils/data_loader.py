@@ -2,15 +2,18 @@ import pandas as pd
 import os
 try:
     from .logger import setup_logger
+    from .instrumentation import instrumented
 except ImportError:
     # Fallback for direct execution (e.g., python data_loader.py)
     import sys
     import os
     sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
     from src.utils.logger import setup_logger
+    from src.utils.instrumentation import instrumented
 
 logger = setup_logger()
 
+@instrumented()
 def load_exportation_data(file_name="exportation.csv"):
     """
     Carrega o arquivo CSV de exportação de dados de aviários.
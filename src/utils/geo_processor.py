@@ -1,16 +1,22 @@
 import pandas as pd
-import geopandas as gpd
-from shapely.geometry import Point, Polygon
 import os
+from typing import TYPE_CHECKING
+
+# geopandas/shapely são pesados e só serão necessários para as análises espaciais;
+# importados apenas para anotações de tipo
+if TYPE_CHECKING:
+    import geopandas as gpd
 
 # Importa o logger
 try:
     from .logger import setup_logger
+    from .instrumentation import instrumented
 except ImportError:
     import sys
     import os
     sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
     from src.utils.logger import setup_logger
+    from src.utils.instrumentation import instrumented
 
 logger = setup_logger()
 
@@ -50,6 +56,7 @@ class GeoProcessor:
 
         logger.info(f"GeoProcessor inicializado com {len(self.immutability_rules)} regras de imutabilidade.")
 
+    @instrumented()
     def apply_immutability_rules(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Aplica as regras de imutabilidade definidas na inicialização.
@@ -135,7 +142,7 @@ class GeoProcessor:
         logger.info(f"Aplicada restrição de imutabilidade. {df['immutable_allocation'].sum()} aviários marcados como imutáveis.")
         return df
 
-    def check_geographical_continuity(self, gdf: gpd.GeoDataFrame) -> bool:
+    def check_geographical_continuity(self, gdf: 'gpd.GeoDataFrame') -> bool:
         """
         Verifica a continuidade geográfica das regiões. (Lógica placeholder - a ser desenvolvida).
         Esta é uma função complexa que exigirá algoritmos de análise espacial.
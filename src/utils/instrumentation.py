@@ -0,0 +1,324 @@
+import functools
+import json
+import os
+import platform
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource  # Indisponível no Windows
+except ImportError:
+    resource = None
+
+# Importa o logger
+try:
+    from .logger import LOG_DIR, setup_logger, get_log_file_path, set_log_context, reset_log_context
+except ImportError:
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+    from src.utils.logger import LOG_DIR, setup_logger, get_log_file_path, set_log_context, reset_log_context
+
+logger = setup_logger()
+
+SUPPORTED_PROFILERS = ('cprofile', 'pyinstrument')
+
+
+def _peak_rss_mb():
+    """
+    Retorna o pico de memória residente (RSS) do processo em MB, ou None se não disponível.
+    É a marca máxima desde o início do processo, não o consumo de uma etapa isolada.
+    """
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss é reportado em bytes no macOS e em KB no Linux
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return round(max_rss / divisor, 3)
+
+
+class StageRecord:
+    """
+    Medições de uma etapa do pipeline. Atributos podem ser ajustados dentro do bloco
+    instrumentado (por exemplo, `record.rows = len(df)`).
+    """
+
+    def __init__(self, name: str, path: str, rows: int = None, **extra):
+        self.name = name
+        self.path = path
+        self.rows = rows
+        self.extra = extra
+        self.wall_time_s = None
+        self.cpu_time_s = None
+        self.process_peak_rss_mb = None
+        self.tracemalloc_peak_mb = None
+        self.tracemalloc_peak_abs_mb = None
+        self.profile_file = None
+        self._traced_start = 0
+        self._traced_peak = 0
+
+    def to_dict(self) -> dict:
+        data = {
+            'name': self.name,
+            'path': self.path,
+            'wall_time_s': self.wall_time_s,
+            'cpu_time_s': self.cpu_time_s,
+            'process_peak_rss_mb': self.process_peak_rss_mb,
+            'tracemalloc_peak_mb': self.tracemalloc_peak_mb,
+            'tracemalloc_peak_abs_mb': self.tracemalloc_peak_abs_mb,
+            'rows': self.rows,
+        }
+        if self.profile_file:
+            data['profile_file'] = self.profile_file
+        if self.extra:
+            data['extra'] = self.extra
+        return data
+
+
+class _NullRecord:
+    """
+    Registro descartável usado quando não há execução instrumentada ativa.
+    """
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NULL_RECORD = _NullRecord()
+
+
+class RunMetrics:
+    """
+    Coleta as medições de todas as etapas de uma execução e as grava em JSON ao lado do log.
+    """
+
+    def __init__(self, run_id: str = None, trace_memory: bool = False, profile_stage: str = None,
+                 profiler: str = 'cprofile', output_path: str = None):
+        """
+        Args:
+            run_id (str, optional): Identificador da execução. Gerado automaticamente se omitido.
+            trace_memory (bool): Ativa o tracemalloc para medir o pico de alocações de cada etapa (com custo extra).
+            profile_stage (str, optional): Nome da etapa a ser perfilada.
+            profiler (str): 'cprofile' ou 'pyinstrument' (se instalado).
+            output_path (str, optional): Caminho do JSON de métricas. Padrão: mesmo nome do log com sufixo '.metrics.json'.
+        """
+        if profiler not in SUPPORTED_PROFILERS:
+            raise ValueError(f"Profiler '{profiler}' não suportado. Opções: {list(SUPPORTED_PROFILERS)}.")
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        self.trace_memory = trace_memory
+        self.profile_stage = profile_stage
+        self.profiler = profiler
+        self.output_path = output_path
+        self.records = []
+        self.started_at = datetime.now()
+        self._start_wall = time.perf_counter()
+        self._start_cpu = time.process_time()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._profile_counts = {}
+
+    def _stack(self) -> list:
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    def _artifact_base(self) -> str:
+        """
+        Retorna o prefixo de caminho usado para os arquivos de métricas e de profiling.
+        """
+        if self.output_path:
+            return self.output_path[:-len('.metrics.json')] if self.output_path.endswith('.metrics.json') else os.path.splitext(self.output_path)[0]
+        # O arquivo de log é único (com rotação); os artefatos de cada execução levam data e run_id
+        log_file = get_log_file_path()
+        log_dir = os.path.dirname(log_file) if log_file else LOG_DIR
+        return os.path.join(log_dir, f"remodelacao_regioes_{self.started_at.strftime('%Y%m%d_%H%M%S')}_{self.run_id}")
+
+    @contextmanager
+    def _profile(self, record: StageRecord):
+        # Etapas repetidas (por exemplo, kmeans_iteration) recebem um número de ocorrência no nome do arquivo
+        with self._lock:
+            occurrence = self._profile_counts.get(record.name, 0) + 1
+            self._profile_counts[record.name] = occurrence
+        base = f"{self._artifact_base()}.{record.name}.{occurrence}"
+        profiler = self.profiler
+        if profiler == 'pyinstrument':
+            try:
+                from pyinstrument import Profiler
+            except ImportError:
+                logger.warning("pyinstrument não está instalado. Usando cProfile.")
+                profiler = 'cprofile'
+
+        if profiler == 'pyinstrument':
+            prof = Profiler()
+            prof.start()
+            try:
+                yield
+            finally:
+                prof.stop()
+                record.profile_file = f"{base}.pyinstrument.html"
+                with open(record.profile_file, 'w', encoding='utf-8') as f:
+                    f.write(prof.output_html())
+        else:
+            import cProfile
+            prof = cProfile.Profile()
+            prof.enable()
+            try:
+                yield
+            finally:
+                prof.disable()
+                record.profile_file = f"{base}.prof"
+                prof.dump_stats(record.profile_file)
+        logger.info("Profiling da etapa '%s' exportado para: %s", record.name, record.profile_file)
+
+    @contextmanager
+    def stage(self, name: str, rows: int = None, **extra):
+        """
+        Mede tempo de parede, tempo de CPU, pico de RSS do processo e, se ativo, o pico do tracemalloc
+        da etapa (acima da memória já alocada na entrada, e também em valor absoluto).
+        """
+        stack = self._stack()
+        parent = stack[-1] if stack else None
+        record = StageRecord(name, f"{parent.path}/{name}" if parent else name, rows=rows, **extra)
+
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        if tracing:
+            # Preserva o pico observado pela etapa pai antes de reiniciar a contagem
+            if parent is not None:
+                parent._traced_peak = max(parent._traced_peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            record._traced_start = tracemalloc.get_traced_memory()[0]
+
+        stack.append(record)
+        context_token = set_log_context(stage=record.path)
+        start_wall = time.perf_counter()
+        start_cpu = time.process_time()
+        try:
+            if self.profile_stage == name:
+                with self._profile(record):
+                    yield record
+            else:
+                yield record
+        finally:
+            record.wall_time_s = round(time.perf_counter() - start_wall, 6)
+            record.cpu_time_s = round(time.process_time() - start_cpu, 6)
+            record.process_peak_rss_mb = _peak_rss_mb()
+            if tracing:
+                record._traced_peak = max(record._traced_peak, tracemalloc.get_traced_memory()[1])
+                record.tracemalloc_peak_mb = round((record._traced_peak - record._traced_start) / (1024 * 1024), 3)
+                record.tracemalloc_peak_abs_mb = round(record._traced_peak / (1024 * 1024), 3)
+                if parent is not None:
+                    parent._traced_peak = max(parent._traced_peak, record._traced_peak)
+            reset_log_context(context_token)
+            stack.pop()
+            with self._lock:
+                self.records.append(record)
+            logger.debug("Etapa '%s': %.3fs parede, %.3fs CPU, linhas=%s.", record.path, record.wall_time_s, record.cpu_time_s, record.rows)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            stages = [record.to_dict() for record in self.records]
+        return {
+            'run_id': self.run_id,
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'finished_at': datetime.now().isoformat(timespec='seconds'),
+            'python_version': platform.python_version(),
+            'platform': platform.platform(),
+            'total_wall_time_s': round(time.perf_counter() - self._start_wall, 6),
+            'total_cpu_time_s': round(time.process_time() - self._start_cpu, 6),
+            'process_peak_rss_mb': _peak_rss_mb(),
+            'stages': stages,
+        }
+
+    def write_json(self) -> str:
+        """
+        Grava as métricas da execução em JSON e retorna o caminho do arquivo.
+        """
+        output_path = self.output_path or f"{self._artifact_base()}.metrics.json"
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+        logger.info("Métricas da execução %s exportadas para: %s", self.run_id, output_path)
+        return output_path
+
+
+_current_run = None
+
+
+def start_run(**kwargs) -> RunMetrics:
+    """
+    Inicia a coleta de métricas para a execução atual. Aceita os mesmos argumentos de RunMetrics.
+    """
+    global _current_run
+    _current_run = RunMetrics(**kwargs)
+    set_log_context(run_id=_current_run.run_id)
+    if _current_run.trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    logger.info("Instrumentação iniciada para a execução %s.", _current_run.run_id)
+    return _current_run
+
+
+def get_current_run():
+    """
+    Retorna a execução instrumentada ativa, ou None.
+    """
+    return _current_run
+
+
+def finish_run(write: bool = True):
+    """
+    Encerra a coleta, grava o JSON de métricas e retorna o seu caminho (ou None se não havia execução ativa).
+
+    Args:
+        write (bool): Se False, apenas encerra a coleta sem gravar o JSON (as medições continuam
+                      disponíveis no objeto retornado por get_current_run antes do encerramento).
+    """
+    global _current_run
+    run = _current_run
+    if run is None:
+        return None
+    _current_run = None
+    output_path = run.write_json() if write else None
+    set_log_context(run_id=None, stage=None)
+    if run.trace_memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    return output_path
+
+
+@contextmanager
+def stage(name: str, rows: int = None, **extra):
+    """
+    Context manager que instrumenta uma etapa na execução ativa. Sem execução ativa, não mede nada.
+
+    Exemplo:
+        with stage('load_exportation_data') as record:
+            df = load_exportation_data()
+            record.rows = len(df)
+    """
+    run = _current_run
+    if run is None:
+        yield _NULL_RECORD
+        return
+    with run.stage(name, rows=rows, **extra) as record:
+        yield record
+
+
+def instrumented(name: str = None):
+    """
+    Decorador equivalente a `stage`, usando o nome da função como nome da etapa por padrão.
+    """
+    def decorator(func):
+        stage_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(stage_name) as record:
+                result = func(*args, **kwargs)
+                # Para funções que retornam DataFrames, registra a quantidade de linhas
+                if result is not None and hasattr(result, '__len__'):
+                    record.rows = len(result)
+                return result
+        return wrapper
+    return decorator
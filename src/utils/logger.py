@@ -1,34 +1,267 @@
+import atexit
+import contextvars
+import json
 import logging
+import logging.handlers
 import os
+import queue
+import threading
 from datetime import datetime
 
-# Define o diretório base para os logs
-LOG_DIR = "logs"
-os.makedirs(LOG_DIR, exist_ok=True)
+try:
+    import fcntl  # Indisponível no Windows
+except ImportError:
+    fcntl = None
+
+# Define o diretório base para os logs, relativo à raiz do projeto (e não ao diretório de trabalho)
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+LOG_DIR = os.environ.get('REMODELACAO_LOG_DIR', os.path.join(PROJECT_ROOT, 'logs'))
+LOG_FILE_BASE = "remodelacao_regioes"
+LOG_FILE_NAME = f"{LOG_FILE_BASE}.log"
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+LOG_LEVELS = ('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL')
+
+# Contexto propagado para cada registro de log (identificador da execução e etapa do pipeline)
+_log_context = contextvars.ContextVar('remodelacao_log_context', default={})
+
+_listener = None
+_file_handler = None
+_writer_lock_file = None
+_configured_loggers = set()
+_configure_lock = threading.RLock()
+
+
+def _resolve_level(level: str) -> int:
+    """
+    Converte o nome do nível de log em seu valor numérico. Nomes desconhecidos usam INFO.
+    """
+    resolved = logging.getLevelName(str(level).upper())
+    if not isinstance(resolved, int):
+        logging.getLogger(__name__).warning("Nível de log '%s' desconhecido. Usando INFO.", level)
+        return logging.INFO
+    return resolved
+
+
+_env_level = _resolve_level(os.environ.get('REMODELACAO_LOG_LEVEL', 'INFO'))
+_level = _env_level
+
+
+class ContextFilter(logging.Filter):
+    """
+    Adiciona os campos 'run_id' e 'stage' do contexto atual a cada registro de log.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = _log_context.get()
+        record.run_id = context.get('run_id')
+        record.stage = context.get('stage')
+        return True
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """
+    Formata cada registro como um objeto JSON em uma única linha.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            'timestamp': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'run_id': getattr(record, 'run_id', None),
+            'stage': getattr(record, 'stage', None),
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            payload['exception'] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False)
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler que apenas interpola a mensagem na thread de origem; a formatação
+    completa (data, nível, JSON) e a escrita ficam a cargo da thread do QueueListener.
+    """
+
+    def emit(self, record: logging.LogRecord) -> None:
+        # O listener (e o arquivo de log) só é criado no primeiro registro emitido,
+        # evitando efeitos colaterais na importação dos módulos
+        if _listener is None:
+            with _configure_lock:
+                if _listener is None:
+                    configure_logging()
+        super().emit(record)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+_queue_handler = LazyQueueHandler(queue.SimpleQueue())
+_queue_handler.addFilter(ContextFilter())
+
+
+def _acquire_writer_lock(log_path: str) -> bool:
+    """
+    Tenta se tornar o único processo escrevendo em log_path. Os handlers com rotação não são seguros
+    entre processos: dois processos rotacionando o mesmo arquivo renomeiam os arquivos um do outro.
+    """
+    global _writer_lock_file
+    if fcntl is None:
+        return False
+    lock_file = open(f"{log_path}.lock", 'a')
+    try:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return False
+    _writer_lock_file = lock_file
+    return True
+
+
+def _release_writer_lock() -> None:
+    global _writer_lock_file
+    if _writer_lock_file is not None:
+        _writer_lock_file.close()
+        _writer_lock_file = None
+
+
+def _build_file_handler(log_dir: str, log_name: str, rotation: str, max_bytes: int, backup_count: int) -> logging.Handler:
+    os.makedirs(log_dir, exist_ok=True)
+    file_name = f"{LOG_FILE_BASE}.{log_name}.log" if log_name else LOG_FILE_NAME
+    log_path = os.path.join(log_dir, file_name)
+    if not _acquire_writer_lock(log_path):
+        # Outro processo já escreve neste arquivo (ou não há lock disponível): este processo usa um arquivo próprio
+        log_path = f"{os.path.splitext(log_path)[0]}.{os.getpid()}.log"
+    if rotation == 'time':
+        return logging.handlers.TimedRotatingFileHandler(log_path, when='midnight', backupCount=backup_count, encoding='utf-8', delay=True)
+    return logging.handlers.RotatingFileHandler(log_path, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8', delay=True)
+
+
+def configure_logging(level: str = None, log_format: str = None, log_dir: str = None, rotation: str = None,
+                      max_bytes: int = None, backup_count: int = None, console: bool = True, log_name: str = None) -> None:
+    """
+    (Re)configura o logging do projeto. Os registros são enfileirados pela thread de cálculo e
+    escritos no console e no arquivo por um QueueListener em segundo plano.
+
+    Cada arquivo de log tem um único processo escritor, garantido por um lock no arquivo '.lock' ao
+    lado do log. Um processo que não obtém o lock escreve em um arquivo próprio, com o PID no nome.
+
+    Os valores omitidos são lidos das variáveis de ambiente REMODELACAO_LOG_LEVEL, REMODELACAO_LOG_FORMAT,
+    REMODELACAO_LOG_DIR, REMODELACAO_LOG_ROTATION, REMODELACAO_LOG_MAX_BYTES e REMODELACAO_LOG_BACKUP_COUNT.
+
+    Args:
+        level (str, optional): Nível mínimo de log. Padrão é 'INFO'.
+        log_format (str, optional): 'text' ou 'json' (JSON-lines com run_id e stage). Padrão é 'text'.
+        log_dir (str, optional): Diretório dos arquivos de log. Padrão é /logs na raiz do projeto.
+        rotation (str, optional): 'size' (por tamanho) ou 'time' (diária). Padrão é 'size'.
+        max_bytes (int, optional): Tamanho máximo do arquivo antes da rotação por tamanho. Padrão é 10 MB.
+        backup_count (int, optional): Quantidade de arquivos rotacionados mantidos. Padrão é 10.
+        console (bool): Se True, também escreve os logs no console.
+        log_name (str, optional): Nome do processo no arquivo de log (ex.: 'allocation_service' gera
+                                  remodelacao_regioes.allocation_service.log). Padrão é REMODELACAO_LOG_NAME
+                                  ou remodelacao_regioes.log.
+    """
+    global _listener
+
+    level = _resolve_level(level) if level else _env_level
+    log_format = log_format or os.environ.get('REMODELACAO_LOG_FORMAT', 'text')
+    log_dir = log_dir or LOG_DIR
+    log_name = log_name or os.environ.get('REMODELACAO_LOG_NAME') or None
+    rotation = rotation or os.environ.get('REMODELACAO_LOG_ROTATION', 'size')
+    max_bytes = max_bytes or int(os.environ.get('REMODELACAO_LOG_MAX_BYTES', 10 * 1024 * 1024))
+    backup_count = backup_count if backup_count is not None else int(os.environ.get('REMODELACAO_LOG_BACKUP_COUNT', 10))
+
+    with _configure_lock:
+        _stop_listener()
+        _listener = _start_listener(level, log_format, log_dir, log_name, rotation, max_bytes, backup_count, console)
+        if _writer_lock_file is None:
+            setup_logger().info("Arquivo de log compartilhado em uso por outro processo. Gravando em: %s", get_log_file_path())
+
+
+def _stop_listener() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+    _release_writer_lock()
+
+
+def _start_listener(level: int, log_format: str, log_dir: str, log_name: str, rotation: str, max_bytes: int,
+                    backup_count: int, console: bool) -> logging.handlers.QueueListener:
+    global _file_handler, _level
+
+    formatter = JsonLinesFormatter() if log_format == 'json' else logging.Formatter(TEXT_FORMAT)
+    handlers = []
+    if console:
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(formatter)
+        handlers.append(console_handler)
+    _file_handler = _build_file_handler(log_dir, log_name, rotation, max_bytes, backup_count)
+    _file_handler.setFormatter(formatter)
+    handlers.append(_file_handler)
+
+    # O nível é aplicado nos loggers (e não no handler) para que mensagens filtradas
+    # sejam descartadas antes mesmo da criação do LogRecord
+    _level = level
+    for logger_name in _configured_loggers:
+        logging.getLogger(logger_name).setLevel(_level)
+
+    listener = logging.handlers.QueueListener(_queue_handler.queue, *handlers, respect_handler_level=False)
+    listener.start()
+    return listener
+
+
+def shutdown_logging() -> None:
+    """
+    Esvazia a fila e encerra o QueueListener, garantindo que todos os registros sejam escritos.
+    """
+    with _configure_lock:
+        _stop_listener()
+
+
+atexit.register(shutdown_logging)
+
+
+def set_log_context(**fields) -> contextvars.Token:
+    """
+    Atualiza os campos de contexto (por exemplo, run_id e stage) anexados aos registros de log.
+    Retorna um token que pode ser usado em reset_log_context para restaurar o contexto anterior.
+    """
+    context = dict(_log_context.get())
+    context.update(fields)
+    return _log_context.set(context)
+
+
+def reset_log_context(token: contextvars.Token) -> None:
+    """
+    Restaura o contexto de log anterior a uma chamada de set_log_context.
+    """
+    _log_context.reset(token)
+
 
 # Configuração básica do logger
 def setup_logger(name="remodelacao_regioes"):
     logger = logging.getLogger(name)
-    logger.setLevel(logging.INFO)
 
     # Evita a duplicação de handlers se o logger já foi configurado
     if not logger.handlers:
-        # Formato da mensagem de log
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-
-        # Handler para console
-        console_handler = logging.StreamHandler()
-        console_handler.setFormatter(formatter)
-        logger.addHandler(console_handler)
-
-        # Handler para arquivo
-        log_file_name = datetime.now().strftime("remodelacao_regioes_%Y%m%d_%H%M%S.log")
-        file_handler = logging.FileHandler(os.path.join(LOG_DIR, log_file_name))
-        file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        logger.setLevel(_level)
+        logger.addHandler(_queue_handler)
+        _configured_loggers.add(name)
 
     return logger
 
+def get_log_file_path():
+    """
+    Retorna o caminho do arquivo de log ativo, ou None se o logging ainda não foi configurado.
+    """
+    return _file_handler.baseFilename if _file_handler is not None else None
+
 # Exemplo de uso (pode ser removido ou adaptado para testes)
 if __name__ == "__main__":
     logger = setup_logger()
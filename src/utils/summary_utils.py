@@ -4,14 +4,17 @@ import os
 # Importa o logger
 try:
     from .logger import setup_logger
+    from .instrumentation import instrumented
 except ImportError:
     import sys
     import os
     sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
     from src.utils.logger import setup_logger
+    from src.utils.instrumentation import instrumented
 
 logger = setup_logger()
 
+@instrumented()
 def summarize_producers_by_extensionist(df: pd.DataFrame, output_dir: str, file_name: str = 'producers_by_extensionist_summary.csv') -> None:
     """
     Sumariza a quantidade de produtores únicos atendidos por cada Extensionista_Proposto
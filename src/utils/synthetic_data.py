@@ -0,0 +1,205 @@
+import os
+import string
+
+import numpy as np
+import pandas as pd
+
+# Importa o logger
+try:
+    from .logger import setup_logger
+except ImportError:
+    import sys
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+    from src.utils.logger import setup_logger
+
+logger = setup_logger()
+
+# Distribuições empíricas observadas em assets/exportation.csv
+NUCLEUS_SIZE_DISTRIBUTION = {1: 47, 2: 117, 3: 85, 4: 71, 5: 20, 6: 13, 7: 3, 8: 5, 9: 4, 10: 1}
+AREA_DISTRIBUTION = {2400: 289, 1500: 170, 1440: 146, 2250: 141, 1200: 97, 1875: 73, 1800: 62, 1750: 20, 2000: 18, 2700: 12, 3240: 6, 756: 4}
+REFERENCE_ROWS = 1105
+REFERENCE_BBOX = {'lat_min': -24.85, 'lat_max': -23.95, 'lon_min': -54.16, 'lon_max': -53.46}
+REFERENCE_MUNICIPALITIES = 14
+AVIARIES_PER_EXTENSIONIST = 55
+AVIARIES_PER_MICROREGION = 11.6
+
+
+def _sample(rng: np.random.Generator, distribution: dict, size: int) -> np.ndarray:
+    values = np.array(list(distribution.keys()))
+    weights = np.array(list(distribution.values()), dtype=float)
+    return rng.choice(values, size=size, p=weights / weights.sum())
+
+
+def _code(index: np.ndarray, length: int = 3) -> np.ndarray:
+    """
+    Converte índices inteiros em códigos alfabéticos de tamanho fixo (0 -> 'AAA', 1 -> 'AAB', ...).
+    """
+    letters = np.array(list(string.ascii_uppercase))
+    digits = [letters[(index // 26 ** power) % 26] for power in reversed(range(length))]
+    code = digits[0]
+    for digit in digits[1:]:
+        code = np.char.add(code, digit)
+    return code
+
+
+def generate_synthetic_exportation(n_rows: int, seed: int = 42, n_immutable_extensionists: int = 1,
+                                   n_immutable_producers: int = 2, pending_fraction: float = 0.01):
+    """
+    Gera um DataFrame sintético com o mesmo esquema de assets/exportation.csv.
+
+    Os aviários são agrupados em núcleos que compartilham coordenadas; os núcleos se concentram em
+    torno dos centros das microrregiões, que por sua vez pertencem a municípios. A área geográfica
+    cresce com a raiz do número de linhas, mantendo a densidade da base real. Cada extensionista
+    atende uma faixa contígua de microrregiões com cerca de 55 aviários (situação atual).
+
+    Args:
+        n_rows (int): Quantidade de aviários a gerar.
+        seed (int): Semente do gerador aleatório, para reprodutibilidade.
+        n_immutable_extensionists (int): Quantidade de extensionistas na lista de imutáveis.
+        n_immutable_producers (int): Quantidade de produtores (dos extensionistas imutáveis) na lista de imutáveis.
+        pending_fraction (float): Fração de aviários com a microrregião 'PENDENTE'.
+
+    Returns:
+        tuple: (DataFrame no esquema bruto do CSV, lista de produtores imutáveis, lista de extensionistas imutáveis).
+    """
+    if n_rows <= 0:
+        raise ValueError("n_rows deve ser maior que zero.")
+    rng = np.random.default_rng(seed)
+    scale = np.sqrt(n_rows / REFERENCE_ROWS)
+
+    # Área geográfica proporcional à raiz do tamanho, centrada na região real
+    lat_center = (REFERENCE_BBOX['lat_min'] + REFERENCE_BBOX['lat_max']) / 2
+    lon_center = (REFERENCE_BBOX['lon_min'] + REFERENCE_BBOX['lon_max']) / 2
+    lat_half = (REFERENCE_BBOX['lat_max'] - REFERENCE_BBOX['lat_min']) / 2 * scale
+    lon_half = (REFERENCE_BBOX['lon_max'] - REFERENCE_BBOX['lon_min']) / 2 * scale
+
+    # Municípios e microrregiões
+    n_municipalities = max(1, int(round(REFERENCE_MUNICIPALITIES * scale ** 2)))
+    municipality_centers = np.column_stack([
+        rng.uniform(lat_center - lat_half, lat_center + lat_half, n_municipalities),
+        rng.uniform(lon_center - lon_half, lon_center + lon_half, n_municipalities),
+    ])
+    municipality_weights = rng.pareto(1.5, n_municipalities) + 0.2
+
+    n_microregions = max(1, int(round(n_rows / AVIARIES_PER_MICROREGION)))
+    microregion_municipality = rng.choice(n_municipalities, size=n_microregions, p=municipality_weights / municipality_weights.sum())
+    microregion_centers = municipality_centers[microregion_municipality] + rng.normal(0, 0.04, (n_microregions, 2))
+    microregion_number = np.zeros(n_microregions, dtype=int)
+    order = np.argsort(microregion_municipality, kind='stable')
+    sorted_municipalities = microregion_municipality[order]
+    first_of_group = np.r_[0, np.flatnonzero(np.diff(sorted_municipalities)) + 1]
+    group_start = np.repeat(first_of_group, np.diff(np.r_[first_of_group, n_microregions]))
+    microregion_number[order] = np.arange(n_microregions) - group_start + 1
+
+    municipality_names = np.char.add('MUNICIPIO ', _code(np.arange(n_municipalities)))
+    microregion_names = np.char.add(_code(microregion_municipality), np.char.zfill(microregion_number.astype(str), 2))
+
+    # Núcleos: tamanhos amostrados da distribuição real até cobrir n_rows
+    nucleus_sizes = _sample(rng, NUCLEUS_SIZE_DISTRIBUTION, int(n_rows / 2.5) + 10)
+    while nucleus_sizes.sum() < n_rows:
+        nucleus_sizes = np.concatenate([nucleus_sizes, _sample(rng, NUCLEUS_SIZE_DISTRIBUTION, int(n_rows / 2.5) + 10)])
+    cumulative = np.cumsum(nucleus_sizes)
+    n_nuclei = int(np.searchsorted(cumulative, n_rows) + 1)
+    nucleus_sizes = nucleus_sizes[:n_nuclei]
+    nucleus_sizes[-1] -= cumulative[n_nuclei - 1] - n_rows
+
+    nucleus_microregion = rng.integers(0, n_microregions, n_nuclei)
+    nucleus_coords = microregion_centers[nucleus_microregion] + rng.normal(0, 0.015, (n_nuclei, 2))
+
+    # Proprietários: alguns possuem mais de um núcleo
+    nucleus_owner = np.minimum(np.arange(n_nuclei) - rng.binomial(1, 0.15, n_nuclei), n_nuclei - 1).clip(0)
+
+    # Extensionistas atuais: faixas contíguas de microrregiões (ordenadas por longitude e latitude)
+    n_extensionists = max(1, int(np.ceil(n_rows / AVIARIES_PER_EXTENSIONIST)))
+    microregion_load = np.bincount(nucleus_microregion, weights=nucleus_sizes, minlength=n_microregions)
+    band = np.floor((microregion_centers[:, 1] - microregion_centers[:, 1].min()) / 0.15).astype(int)
+    sweep = np.lexsort((microregion_centers[:, 0] * np.where(band % 2 == 0, 1, -1), band))
+    cumulative_load = np.cumsum(microregion_load[sweep])
+    microregion_extensionist = np.empty(n_microregions, dtype=int)
+    microregion_extensionist[sweep] = np.minimum((cumulative_load - 1) * n_extensionists // max(1, n_rows), n_extensionists - 1)
+    extensionist_names = np.char.add('EXTENSIONISTA ', np.char.zfill(np.arange(1, n_extensionists + 1).astype(str), 4))
+
+    # Expansão de núcleos para aviários
+    aviary_nucleus = np.repeat(np.arange(n_nuclei), nucleus_sizes)
+    aviary_microregion = nucleus_microregion[aviary_nucleus]
+    aviary_coords = nucleus_coords[aviary_nucleus]
+    # Parte dos aviários de um núcleo pertence a outro produtor (ex.: familiares)
+    aviary_producer = aviary_nucleus * 2 + rng.binomial(1, 0.12, n_rows)
+
+    microregion_column = microregion_names[aviary_microregion].astype(object)
+    microregion_column[rng.random(n_rows) < pending_fraction] = 'PENDENTE'
+
+    df = pd.DataFrame({
+        'ID_Aviario': np.arange(101, 101 + n_rows),
+        'ID_Nucleo': aviary_nucleus + 1,
+        'Nome_Proprietario': np.char.add('PROPRIETARIO ', np.char.zfill((nucleus_owner[aviary_nucleus] + 1).astype(str), 7)),
+        'Nome_Produtor': np.char.add('PRODUTOR ', np.char.zfill((aviary_producer + 1).astype(str), 7)),
+        'Extensionista': extensionist_names[microregion_extensionist[aviary_microregion]],
+        'Latitude': np.round(aviary_coords[:, 0], 6),
+        'Longitude': np.round(aviary_coords[:, 1], 6),
+        'Municipio': municipality_names[microregion_municipality[aviary_microregion]],
+        'Microrregiao': microregion_column,
+        'Area': _sample(rng, AREA_DISTRIBUTION, n_rows),
+    })
+
+    # Listas de imutabilidade: produtores escolhidos entre os atendidos pelos extensionistas imutáveis
+    n_immutable_extensionists = min(n_immutable_extensionists, n_extensionists)
+    immutable_extensionists = rng.choice(extensionist_names, size=n_immutable_extensionists, replace=False).tolist()
+    candidate_producers = df.loc[df['Extensionista'].isin(immutable_extensionists), 'Nome_Produtor'].unique()
+    n_immutable_producers = min(n_immutable_producers, len(candidate_producers))
+    immutable_producers = rng.choice(candidate_producers, size=n_immutable_producers, replace=False).tolist() if n_immutable_producers else []
+
+    logger.info("Dataset sintético gerado: %s aviários, %s núcleos, %s microrregiões, %s municípios, %s extensionistas.",
+                n_rows, n_nuclei, n_microregions, n_municipalities, n_extensionists)
+    return df, immutable_producers, immutable_extensionists
+
+
+def synthetic_dataset_paths(n_rows: int, output_dir: str, seed: int = 42) -> dict:
+    """
+    Retorna os caminhos absolutos dos arquivos do dataset sintético de n_rows aviários e semente seed.
+    """
+    prefix = os.path.join(os.path.abspath(output_dir), f"synthetic_{n_rows}_seed{seed}")
+    return {
+        'exportation': f"{prefix}_exportation.csv",
+        'immutable_producers': f"{prefix}_PRODUTORES_IMUTAVEIS.csv",
+        'immutable_extensionists': f"{prefix}_EXTENSIONISTAS_IMUTAVEIS.csv",
+    }
+
+
+def write_synthetic_dataset(n_rows: int, output_dir: str, seed: int = 42, **kwargs) -> dict:
+    """
+    Gera e grava um dataset sintético no formato de /assets (separador ';' e decimal ',').
+
+    Args:
+        n_rows (int): Quantidade de aviários a gerar.
+        output_dir (str): Diretório de saída.
+        seed (int): Semente do gerador aleatório.
+        **kwargs: Argumentos adicionais repassados para generate_synthetic_exportation.
+
+    Returns:
+        dict: Caminhos absolutos dos arquivos 'exportation', 'immutable_producers' e 'immutable_extensionists'.
+    """
+    df, immutable_producers, immutable_extensionists = generate_synthetic_exportation(n_rows, seed=seed, **kwargs)
+    os.makedirs(output_dir, exist_ok=True)
+    paths = synthetic_dataset_paths(n_rows, output_dir, seed=seed)
+    df.to_csv(paths['exportation'], sep=';', decimal=',', index=False)
+    pd.DataFrame({'Nome_Produtor': immutable_producers}).to_csv(paths['immutable_producers'], sep=';', index=False)
+    pd.DataFrame({'Extensionista_Atual': immutable_extensionists}).to_csv(paths['immutable_extensionists'], sep=';', index=False)
+    logger.info("Dataset sintético com %s aviários exportado para: %s", n_rows, paths['exportation'])
+    return paths
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Gera datasets sintéticos no esquema de exportation.csv.")
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output-dir', default=os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'benchmarks', 'data')))
+    parser.add_argument('--immutable-extensionists', type=int, default=1)
+    parser.add_argument('--immutable-producers', type=int, default=2)
+    args = parser.parse_args()
+    for rows in args.rows:
+        write_synthetic_dataset(rows, args.output_dir, seed=args.seed,
+                                n_immutable_extensionists=args.immutable_extensionists,
+                                n_immutable_producers=args.immutable_producers)